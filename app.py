@@ -1,15 +1,24 @@
 # app.py
 
 import dash
-from dash import html, dcc, Output, Input, State, no_update
-import importlib
+from dash import html, dcc, Output, Input, State, ALL, no_update
+import json
 import os
 import flask
 import logging
+import time
+from cache import LayoutCache
+import zoom  # noqa: F401  Enregistre le callback de zoom des graphiques sous-échantillonnés
+import population_map  # noqa: F401  Enregistre le callback du cercle de population (page 5)
+import http_cache
+import metrics
+from refresh import Refresher
+from registry import PageRegistry
 
 # Configure le logging pour diagnostiquer les problèmes
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+startup_time = time.perf_counter()
 
 # Initialisation du serveur Flask
 server = flask.Flask(__name__)
@@ -20,26 +29,58 @@ app.suppress_callback_exceptions = True
 app.serve_locally = False
 app.title = "Financial Dashboard"
 
+# Métriques Prometheus sur /metrics (metrics.py), puis réponses compressées et ETag (http_cache.py).
+# L'ordre compte : les hooks after_request s'exécutent en ordre inverse, les métriques voient donc la taille compressée
+metrics.install(app)
+http_cache.install(server)
+
 # Définition des noms des pages et leurs chemins
 page_names = {
-    "page1": {"name": "Accueil", "path": "/accueil", "icon": "fas fa-home"},
-    "page4": {"name": "Desinflationary bust", "path": "/Desinflationary-boom", "icon": "fas fa-chart-bar"},
-    "page5": {"name": "Desinflationary boom", "path": "/Desinflationary-bust", "icon": "fas fa-chart-bar"},
-    "page3": {"name": "Inflationary bust", "path": "/Inflationary-bust", "icon": "fas fa-chart-bar"},
+    # "daily" : la page dépend de la date du jour (fin de la période affichée), reconstruite à minuit
+    "page1": {"name": "Accueil", "path": "/accueil", "icon": "fas fa-home", "daily": True,
+              "data": ["data/T10YIE.csv", "data/M2SL.csv", "data/WTISPLC.csv"]},
+    "page4": {"name": "Desinflationary bust", "path": "/Desinflationary-boom", "icon": "fas fa-chart-bar",
+              "data": ["data/API_PA.NUS.FCRF_DS2_en_csv_v2_13510.csv", "data/defaut_note.csv", "data/noteS&P.csv",
+                       "data/treasury_yields_with_iso3.csv"]},
+    "page5": {"name": "Desinflationary boom", "path": "/Desinflationary-bust", "icon": "fas fa-chart-bar",
+              "data": ["data/API_NY.GDP.MKTP.KD.ZG_DS2_fr_csv_v2_17870.csv", "data/population.asc"]},
+    "page3": {"name": "Inflationary bust", "path": "/Inflationary-bust", "icon": "fas fa-chart-bar",
+              "data": ["data/big-mac-raw-index.csv", "data/API_PA.NUS.FCRF_DS2_en_csv_v2_13510.csv"]},
     "page2": {"name": "Inflationary boom", "path": "/Inflationary-boom", "icon": "fas fa-chart-bar"},
-    # "page6": {"name": "Ethereum Flippening", "path": "/Ethereum-flippening", "icon": "fas fa-chart-bar"},
+    # "page6": {"name": "Ethereum Flippening", "path": "/Ethereum-flippening", "icon": "fas fa-chart-bar",
+    #           "data": ["data/data_hash_price.csv"]},
 }
 
-# Préchargement des layouts des pages
-pages = {}
-for page in page_names.keys():
-    try:
-        logger.info(f"Chargement du module {page}")
-        module = importlib.import_module(page)
-        pages[page] = module.layout
-    except ImportError as e:
-        logger.error(f"Erreur lors du chargement de {page}: {str(e)}")
-        pages[page] = html.Div(f"Erreur : Module {page} non trouvé", style={'color': 'red'})
+# Route -> page, calculé une seule fois
+path_to_page = {data['path']: page for page, data in page_names.items()}
+
+# Mode de navigation (DASH_NAVIGATION) :
+# - "server" : chaque changement d'URL renvoie le layout complet de la page (display_page)
+# - "client" : chaque page est montée dans son propre conteneur à la première visite puis seulement
+#   affichée ou masquée dans le navigateur ; revenir sur une page déjà visitée ne fait aucune requête
+#   et conserve les graphiques déjà initialisés
+NAVIGATION_MODE = os.environ.get('DASH_NAVIGATION', 'server')
+
+# Registre des pages : les layouts sont construits à la première visite de chaque page,
+# ou relus depuis le cache disque partagé entre les workers (désactivable avec DASH_LAYOUT_CACHE=0)
+layout_cache = LayoutCache() if os.environ.get('DASH_LAYOUT_CACHE', '1') != '0' else None
+pages = PageRegistry(page_names, cache=layout_cache)
+
+# Préchargement de toutes les pages avant le fork des workers (DASH_PRELOAD=1, voir gunicorn.conf.py),
+# ou préchauffage optionnel en arrière-plan dans chaque worker (DASH_WARMUP=1)
+if os.environ.get('DASH_PRELOAD') == '1':
+    pages.preload()
+elif os.environ.get('DASH_WARMUP') == '1':
+    pages.warm_up()
+
+# Reconstruction en arrière-plan des pages dont les données ont changé (DASH_REFRESH_INTERVAL),
+# le thread est démarré à la première requête de chaque worker
+refresher = Refresher(pages)
+
+
+@server.before_request
+def start_refresher():
+    refresher.start()
 
 
 # Sommaire avec un design harmonieux
@@ -56,11 +97,7 @@ def create_sidebar():
                                 style={'marginRight': '10px', 'fontSize': '20px'}), page_data['name']],
                         href=page_data['path'],
                         id=f"nav-link-{page}",
-                        className="nav-link",
-                        style={'padding': '15px 20px', 'color': '#ffffff', 'borderRadius': '10px',
-                               'marginBottom': '15px', 'display': 'flex', 'alignItems': 'center',
-                               'textDecoration': 'none', 'fontSize': '18px', 'fontFamily': 'Arial, sans-serif',
-                               'transition': 'background-color 0.3s, transform 0.2s'}
+                        className="nav-link"  # Styles (et état actif) dans assets/style.css
                     ) for page, page_data in page_names.items()
                 ],
                 style={'padding': '0 20px'}
@@ -72,60 +109,107 @@ def create_sidebar():
     )
 
 
+# Conteneurs des pages en mode de navigation client, vides jusqu'à la première visite
+def create_page_slots():
+    return [html.Div(id={'type': 'page-slot', 'page': page}, style={'display': 'none'}) for page in page_names]
+
+
 # Mise en page principale
 app.layout = html.Div([
     dcc.Location(id='url', refresh=True),
     create_sidebar() if len(page_names) > 1 else None,
-    html.Div(id='page-container', style={'marginLeft': '300px' if len(page_names) > 1 else '0', 'height': '100vh',
+    html.Div(create_page_slots() if NAVIGATION_MODE == 'client' else None,
+             id='page-container', style={'marginLeft': '300px' if len(page_names) > 1 else '0', 'height': '100vh',
                                          'width': 'calc(100vw - 300px)' if len(page_names) > 1 else '100vw',
                                          'overflow': 'hidden', 'padding': '15px 30px 30px 15px',
                                          'backgroundColor': '#2a3a50'}),
     dcc.Store(id='current-page', data='page1'),
+    # Mode client : page à charger depuis le serveur et pages déjà montées dans le navigateur
+    dcc.Store(id='requested-page'),
+    dcc.Store(id='loaded-pages', data=[]),
 ], style={'margin': '0', 'padding': '0', 'height': '100vh', 'width': '100vw', 'overflow': 'hidden',
           'background': 'linear-gradient(135deg, #2a3a50 0%, #3b4a60 100%)', 'position': 'fixed', 'top': '0',
           'left': '0'})
 
+logger.info(f"Application prête en {(time.perf_counter() - startup_time) * 1000:.0f} ms")
 
-# Callback pour gérer le changement de page
-@app.callback(
-    Output('page-container', 'children'),
-    Output('current-page', 'data'),
-    Input('url', 'pathname'),
-    prevent_initial_call=False
-)
-def display_page(pathname):
-    logger.info(f"Changement de page vers {pathname}")
-    if pathname is None or pathname == '/':
-        page = "page1"
-    else:
-        path_to_page = {data['path']: page for page, data in page_names.items()}
-        page = path_to_page.get(pathname, "page1")
 
+def render_page(page):
+    metrics.set_page(page)
     layout = pages.get(page, html.Div("Page non trouvée",
                                       style={'padding': '20px', 'fontSize': '24px', 'color': '#ff4d4d',
                                              'fontFamily': 'Arial, sans-serif'}))
-    return html.Div(layout, id=f'page-content-{page}', style={'height': '100%', 'width': '100%'}), page
-
+    return html.Div(layout, id=f'page-content-{page}', style={'height': '100%', 'width': '100%'})
+
+
+if NAVIGATION_MODE == 'client':
+    # Affiche la page correspondant à l'URL et masque les autres, sans appel au serveur ;
+    # une page pas encore montée est demandée via le store requested-page
+    app.clientside_callback(
+        """
+        function(pathname, loaded) {
+            const routes = %s;
+            const page = routes[pathname] || 'page1';
+            const slots = dash_clientside.callback_context.outputs_list[0];
+            const styles = slots.map(function(slot) {
+                return slot.id.page === page ? {'height': '100%%', 'width': '100%%'} : {'display': 'none'};
+            });
+            const request = (loaded || []).includes(page) ? dash_clientside.no_update : page;
+            return [styles, page, request];
+        }
+        """ % json.dumps(path_to_page),
+        Output({'type': 'page-slot', 'page': ALL}, 'style'),
+        Output('current-page', 'data'),
+        Output('requested-page', 'data'),
+        Input('url', 'pathname'),
+        State('loaded-pages', 'data'),
+    )
 
-# Callback pour mettre à jour le style des boutons
-@app.callback(
-    [Output(f"nav-link-{page}", "style") for page in page_names.keys()],
+    # Remplit le conteneur de la page demandée ; les autres pages montées ne sont pas renvoyées
+    @app.callback(
+        Output({'type': 'page-slot', 'page': ALL}, 'children'),
+        Output('loaded-pages', 'data'),
+        Input('requested-page', 'data'),
+        State('loaded-pages', 'data'),
+        prevent_initial_call=True
+    )
+    def load_page(page, loaded):
+        logger.info(f"Chargement de la page {page} dans le navigateur")
+        slots = dash.callback_context.outputs_list[0]
+        children = [render_page(page) if slot['id']['page'] == page else no_update for slot in slots]
+        return children, sorted(set(loaded or []) | {page})
+else:
+    # Callback pour gérer le changement de page
+    @app.callback(
+        Output('page-container', 'children'),
+        Output('current-page', 'data'),
+        Input('url', 'pathname'),
+        prevent_initial_call=False
+    )
+    def display_page(pathname):
+        logger.info(f"Changement de page vers {pathname}")
+        if pathname is None or pathname == '/':
+            page = "page1"
+        else:
+            page = path_to_page.get(pathname, "page1")
+        return render_page(page), page
+
+
+# Callback côté client pour marquer le bouton de la page active (classe CSS "active"),
+# sans requête au serveur à chaque navigation
+app.clientside_callback(
+    """
+    function(pathname) {
+        const routes = %s;
+        const page = routes[pathname] || 'page1';
+        return %s.map(function(name) {
+            return name === page ? 'nav-link active' : 'nav-link';
+        });
+    }
+    """ % (json.dumps(path_to_page), json.dumps(list(page_names))),
+    [Output(f"nav-link-{page}", "className") for page in page_names.keys()],
     Input('url', 'pathname')
 )
-def update_active_link(pathname):
-    base_style = {'padding': '15px 20px', 'color': '#ffffff', 'borderRadius': '10px', 'marginBottom': '15px',
-                  'display': 'flex', 'alignItems': 'center', 'textDecoration': 'none', 'fontSize': '18px',
-                  'fontFamily': 'Arial, sans-serif', 'transition': 'background-color 0.3s, transform 0.2s'}
-    active_style = base_style.copy()
-    active_style.update({'backgroundColor': 'rgba(0, 135, 147, 0.8)', 'color': 'white', 'transform': 'scale(1.05)'})
-
-    if pathname is None or pathname == '/':
-        active_page = "page1"
-    else:
-        path_to_page = {data['path']: page for page, data in page_names.items()}
-        active_page = path_to_page.get(pathname, "page1")
-
-    return [active_style if page == active_page else base_style for page in page_names.keys()]
 
 
 # Route pour favicon
@@ -0,0 +1,95 @@
+# Ajustement du prix BTC de la page 6 : pipeline scikit-learn (PolynomialFeatures + LinearRegression) contre
+# polyfit.py (moindres carrés NumPy, coefficients conservés dans le cache disque).
+# Chaque mesure d'import est faite dans un processus neuf, numpy et pandas étant déjà importés (comme dans la page).
+# Lancement depuis la racine du dépôt : python -m benchmarks.bench_fit
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+IMPORTS = {
+    'scikit-learn': "from sklearn.linear_model import LinearRegression\n"
+                    "from sklearn.preprocessing import PolynomialFeatures\n"
+                    "from sklearn.pipeline import make_pipeline",
+    'polyfit': "from polyfit import fitted",
+}
+REPEAT = 5
+FIT_REPEAT = 50
+
+_CHILD = """
+import time
+import numpy, pandas
+start = time.perf_counter()
+{statement}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def import_ms(statement):
+    timings = []
+    for _ in range(REPEAT):
+        output = subprocess.run([sys.executable, '-c', _CHILD.format(statement=statement)], cwd=ROOT_DIR,
+                                check=True, capture_output=True, text=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def best_of(func, repeat=FIT_REPEAT):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+# Données d'entraînement de la page 6 (prix quotidien depuis mars 2016, t en années)
+def training_data():
+    from timeseries import load_series
+
+    df = load_series('data_hash_price', 'data/data_hash_price.csv', 'Date').to_frame('Date')
+    start_date = pd.to_datetime("2016-03-01")
+    df = df[(df['Date'] >= start_date) & (df['market_price'] > 0)]
+    return ((df['Date'] - start_date).dt.days / 365.25).values, df['market_price'].values
+
+
+def main():
+    os.environ['DASH_CACHE_DIR'] = tempfile.mkdtemp(prefix='bench-fit-')
+    print(f"{'import':<14} {'temps (ms)':>10}")
+    imports = {name: import_ms(statement) for name, statement in IMPORTS.items()}
+    for name, ms in imports.items():
+        print(f"{name:<14} {ms:>10.1f}")
+
+    from sklearn.linear_model import LinearRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import PolynomialFeatures
+
+    import polyfit
+
+    polyfit.FIT_DIR = os.path.join(os.environ['DASH_CACHE_DIR'], 'fits')
+    t, y = training_data()
+    future = np.linspace(0, 25, 9000)
+    pipeline = make_pipeline(PolynomialFeatures(2), LinearRegression()).fit(t.reshape(-1, 1), y)
+    deviation = np.max(np.abs(polyfit.fit_polynomial(t, y, 2).predict(future) - pipeline.predict(future.reshape(-1, 1))))
+
+    sklearn_ms = best_of(lambda: make_pipeline(PolynomialFeatures(2), LinearRegression()).fit(t.reshape(-1, 1), y))
+    numpy_ms = best_of(lambda: polyfit.fit_polynomial(t, y, 2))
+    polyfit.fitted('bench', t, y)
+    cached_ms = best_of(lambda: polyfit.fitted('bench', t, y))
+    print(f"\n{'ajustement':<14} {'temps (ms)':>10}   ({len(t)} points, degré 2)")
+    print(f"{'scikit-learn':<14} {sklearn_ms:>10.2f}")
+    print(f"{'numpy':<14} {numpy_ms:>10.2f}")
+    print(f"{'numpy (cache)':<14} {cached_ms:>10.2f}")
+    print(f"\nÉcart maximal des prédictions jusqu'en 2041 : {deviation:.3g} $")
+    print(f"Gain au démarrage d'un worker : {imports['scikit-learn'] + sklearn_ms - imports['polyfit'] - cached_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# Comparaison du temps de chargement des CSV de data/ : pd.read_csv contre le cache binaire de loader.py
+# Lancement depuis la racine du dépôt : python -m benchmarks.bench_loader
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Cache binaire dans un répertoire temporaire vide : la première lecture est mesurée sans toucher au cache
+# d'une instance déployée
+os.environ['DASH_CACHE_DIR'] = tempfile.mkdtemp(prefix='bench-loader-')
+
+import loader  # noqa: E402
+
+# Mêmes options de lecture que les pages
+FILES = {
+    'data/T10YIE.csv': {'parse_dates': ['observation_date']},
+    'data/M2SL.csv': {'parse_dates': ['observation_date']},
+    'data/WTISPLC.csv': {'parse_dates': ['observation_date']},
+    'data/big-mac-raw-index.csv': {'parse_dates': ['date']},
+    'data/API_PA.NUS.FCRF_DS2_en_csv_v2_13510.csv': {'skiprows': 4},
+    'data/API_NY.GDP.MKTP.KD.ZG_DS2_fr_csv_v2_17870.csv': {'skiprows': 4},
+    'data/defaut_note.csv': {},
+    'data/noteS&P.csv': {},
+    'data/treasury_yields_with_iso3.csv': {},
+    'data/data_hash_price.csv': {'parse_dates': ['Date']},
+}
+REPEAT = 20
+
+
+def best_of(func, repeat=REPEAT):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print(f"{'fichier':<52} {'csv (ms)':>9} {'1er (ms)':>9} {'cache (ms)':>10} {'gain':>6}")
+    total_csv = total_cached = 0
+    for path, kwargs in FILES.items():
+        full_path = os.path.join(loader.ROOT_DIR, path)
+        csv_ms = best_of(lambda: pd.read_csv(full_path, **kwargs))
+        start = time.perf_counter()
+        loader.read_csv(path, **kwargs)
+        first_ms = (time.perf_counter() - start) * 1000
+        cached_ms = best_of(lambda: loader.read_csv(path, **kwargs))
+        total_csv += csv_ms
+        total_cached += cached_ms
+        print(f"{os.path.basename(path):<52} {csv_ms:>9.2f} {first_ms:>9.2f} {cached_ms:>10.2f} {csv_ms / cached_ms:>5.1f}x")
+    print(f"{'total':<52} {total_csv:>9.2f} {'':>9} {total_cached:>10.2f} {total_csv / total_cached:>5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+# Mesures par page : temps d'import des bibliothèques, temps d'import du module de la page (qui construit son
+# layout), taille du layout sérialisé, nombre de points des figures,
+# et latence des callbacks de navigation à travers le client de test Flask.
+# Lancement depuis la racine du dépôt :
+#   python -m benchmarks.bench_pages --output resultats.json
+#   python -m benchmarks.bench_pages --baseline resultats.json --threshold 10   (échoue en cas de régression)
+import argparse
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+REPEAT = 5
+# Une mesure plus haute que la référence est une régression (toutes les métriques suivies : plus bas = mieux)
+TRACKED = ('import_ms', 'layout_bytes', 'points', 'callback_first_ms', 'callback_ms')
+# Tableaux des traces comptés comme des points (le plus long par trace)
+POINT_KEYS = ('x', 'y', 'z', 'lat', 'lon', 'locations', 'values')
+DTYPE_SIZES = {'f8': 8, 'f4': 4, 'i4': 4, 'u4': 4, 'i2': 2, 'u2': 2, 'i1': 1, 'u1': 1}
+
+
+def _env():
+    # Pas de cache des layouts : chaque mesure construit réellement la page
+    return dict(os.environ, DASH_LAYOUT_CACHE='0', DASH_PRELOAD='0', DASH_WARMUP='0', DASH_NAVIGATION='server')
+
+
+def _array_length(value):
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, dict) and 'bdata' in value:
+        # Tableaux NumPy encodés en base64 par plotly (format "typed array")
+        if 'shape' in value:
+            return int(str(value['shape']).split(',')[0])
+        return len(base64.b64decode(value['bdata'])) // DTYPE_SIZES.get(value.get('dtype'), 8)
+    return 0
+
+
+def count_points(node):
+    if isinstance(node, dict):
+        if 'data' in node and 'layout' in node and isinstance(node['data'], list):
+            return sum(max([_array_length(trace.get(key)) for key in POINT_KEYS] + [0])
+                       for trace in node['data'] if isinstance(trace, dict))
+        return sum(count_points(value) for value in node.values())
+    if isinstance(node, list):
+        return sum(count_points(value) for value in node)
+    return 0
+
+
+# --- Mesure d'une page dans un processus neuf (imports à froid) ---
+# library_import_ms : bibliothèques et modules communs (registre compris), hors page ;
+# import_ms : import du module de la page par le registre, construction du layout comprise
+def measure_page(page):
+    start = time.perf_counter()
+    import dash  # noqa: F401
+    import pandas  # noqa: F401
+    import plotly.express  # noqa: F401
+    from plotly.io.json import to_json_plotly
+    from registry import PageRegistry
+    library_import_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    layout = PageRegistry({page: {}})._import(page)
+    import_ms = (time.perf_counter() - start) * 1000
+
+    data = to_json_plotly(layout)
+    return {'library_import_ms': library_import_ms, 'import_ms': import_ms, 'layout_bytes': len(data.encode()),
+            'points': count_points(json.loads(data))}
+
+
+# --- Latence des callbacks de navigation, du premier appel (construction) aux appels suivants ---
+def measure_callbacks():
+    from app import page_names, server
+
+    client = server.test_client()
+    results = {}
+    for page, page_data in page_names.items():
+        body = {"output": "..page-container.children...current-page.data..",
+                "outputs": [{"id": "page-container", "property": "children"},
+                            {"id": "current-page", "property": "data"}],
+                "inputs": [{"id": "url", "property": "pathname", "value": page_data['path']}],
+                "changedPropIds": ["url.pathname"], "state": []}
+        timings = []
+        for _ in range(REPEAT + 1):
+            start = time.perf_counter()
+            response = client.post('/_dash-update-component', json=body)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"display_page {page_data['path']} : statut {response.status_code}")
+        results[page] = {'callback_first_ms': timings[0], 'callback_ms': statistics.median(timings[1:])}
+    # update_active_link est un callback côté client (app.py) : aucune requête au serveur à mesurer
+    return results
+
+
+def _run_child(*args):
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_pages', *args], cwd=ROOT_DIR, env=_env(),
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run():
+    from app import page_names
+
+    results = {page: _run_child('--measure-page', page) for page in page_names}
+    for page, timings in _run_child('--measure-callbacks').items():
+        results[page].update(timings)
+    return {'python': sys.version.split()[0], 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'pages': results}
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for page, metrics in results['pages'].items():
+        reference = baseline['pages'].get(page)
+        if reference is None:
+            continue
+        for metric in TRACKED:
+            old, new = reference.get(metric), metrics.get(metric)
+            if old and new is not None and (new - old) / old * 100 > threshold:
+                regressions.append(f"{page} {metric} : {old:.1f} -> {new:.1f} (+{(new - old) / old * 100:.0f} %)")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'page':<8} {'biblio (ms)':>11} {'import page (ms)':>16} {'layout (o)':>11} {'points':>8} "
+          f"{'1er cb (ms)':>11} {'cb (ms)':>8}")
+    for page, m in results['pages'].items():
+        print(f"{page:<8} {m['library_import_ms']:>11.0f} {m['import_ms']:>16.0f} {m['layout_bytes']:>11} "
+              f"{m['points']:>8} {m['callback_first_ms']:>11.1f} {m['callback_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesures de performance des pages du dashboard")
+    parser.add_argument('--output', help="fichier JSON où écrire les résultats")
+    parser.add_argument('--baseline', help="résultats JSON de référence à comparer")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="hausse maximale tolérée par métrique, en pourcentage (10 par défaut)")
+    parser.add_argument('--measure-page', help=argparse.SUPPRESS)
+    parser.add_argument('--measure-callbacks', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure_page:
+        print(json.dumps(measure_page(args.measure_page)))
+        return 0
+    if args.measure_callbacks:
+        print(json.dumps(measure_callbacks()))
+        return 0
+
+    results = run()
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"Régression : {line}")
+        if regressions:
+            return 1
+        print(f"Aucune régression au-delà de {args.threshold:.0f} %")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
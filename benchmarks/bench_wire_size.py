@@ -0,0 +1,37 @@
+# Taille sur le réseau des réponses de changement de page (display_page) : brute, gzip et brotli,
+# puis revalidation du layout initial par ETag
+# Lancement depuis la racine du dépôt : python -m benchmarks.bench_wire_size
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_cache  # noqa: E402
+from app import page_names, server  # noqa: E402
+
+ENCODINGS = ['identity', 'gzip'] + (['br'] if http_cache.brotli is not None else [])
+
+
+def navigate(client, path, encoding):
+    body = {"output": "..page-container.children...current-page.data..",
+            "outputs": [{"id": "page-container", "property": "children"},
+                        {"id": "current-page", "property": "data"}],
+            "inputs": [{"id": "url", "property": "pathname", "value": path}],
+            "changedPropIds": ["url.pathname"], "state": []}
+    return client.post('/_dash-update-component', json=body, headers={'Accept-Encoding': encoding})
+
+
+def main():
+    client = server.test_client()
+    print(f"{'page':<8} {'chemin':<24}" + ''.join(f" {encoding + ' (o)':>14}" for encoding in ENCODINGS))
+    for page, page_data in page_names.items():
+        sizes = [len(navigate(client, page_data['path'], encoding).data) for encoding in ENCODINGS]
+        print(f"{page:<8} {page_data['path']:<24}" + ''.join(f" {size:>14}" for size in sizes))
+
+    first = client.get('/_dash-layout', headers={'Accept-Encoding': 'gzip'})
+    again = client.get('/_dash-layout', headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+    print(f"/_dash-layout : {len(first.data)} o puis {again.status_code} ({len(again.data)} o) après revalidation")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# Budget de temps d'import de l'application (démarrage à froid d'un worker gunicorn) : "from app import server" est
+# exécuté sous python -X importtime dans des processus neufs. La commande échoue si le temps d'import cumulé dépasse
+# le budget absolu, ou RELATIVE_BUDGET fois celui de "import dash" mesuré dans les mêmes conditions (budget
+# indépendant de la machine, aussi vérifié par tests/test_import_time.py), ou si un module lourd réservé à la construction des pages (NumPy, pandas, Plotly Express,
+# scikit-learn...) est importé au démarrage ; la chaîne d'imports responsable est alors affichée.
+# Lancement depuis la racine du dépôt : python -m benchmarks.check_import_time [--budget-ms 1500] [--runs 3]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', '1500'))
+RUNS = 3
+TARGET = 'app'
+# Référence mesurée à chaque exécution : l'application ne peut pas démarrer sans dash (et Flask, qu'il importe)
+BASELINE = 'dash'
+# Temps d'import maximal de l'application, en multiple de celui de la référence. NumPy, pandas et Plotly Express
+# réunis ajoutent environ 60 % à l'import de dash : le budget laisse place au bruit de mesure, pas à eux
+RELATIVE_BUDGET = 1.5
+# Modules importés seulement à la construction des pages ou par les callbacks qui en ont besoin.
+# plotly.graph_objects n'y figure pas : dash l'importe lui-même (dash.dcc.Graph), quel que soit le code de
+# l'application. Ses classes de traces (Scatter, Choropleth...) ne sont chargées qu'à leur premier usage.
+HEAVY_MODULES = ('numpy', 'pandas', 'plotly.express', 'sklearn', 'scipy', 'statsmodels')
+
+
+def _env():
+    env = dict(os.environ)
+    # Ni préchargement ni préchauffage des pages : seul l'import de l'application est mesuré
+    env.update({'DASH_PRELOAD': '0', 'DASH_WARMUP': '0', 'DASH_CACHE_DIR': tempfile.mkdtemp(prefix='import-time-')})
+    return env
+
+
+# Lignes "import time: self [us] | cumulative | module" (ordre postfixe, profondeur donnée par l'indentation)
+def parse(stderr):
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, self_us, cumulative_us, name = (part for part in [''] + line[len('import time:'):].split('|'))
+        stripped = name.lstrip()
+        entries.append({'name': stripped, 'depth': (len(name) - len(stripped) - 1) // 2,
+                        'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+    return entries
+
+
+# Entrées de l'import de `target` seul : celles qui précèdent son entrée, après l'import de premier niveau précédent
+# (site et ses fichiers .pth importent leurs propres modules avant l'application)
+def measure(target=TARGET, statement=f"from {TARGET} import server"):
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=ROOT_DIR, env=_env(), check=True, capture_output=True, text=True)
+    entries = parse(output.stderr)
+    end = next(i for i, entry in enumerate(entries) if entry['name'] == target and entry['depth'] == 0)
+    start = max((i for i in range(end) if entries[i]['depth'] == 0), default=-1) + 1
+    return entries[start:end + 1]
+
+
+# Mesures alternées de TARGET et de BASELINE (une dérive de la machine touche les deux) : entrées de la mesure la
+# plus rapide de TARGET, et temps cumulés les plus bas de chacun, en ms
+def measure_with_baseline(runs=RUNS):
+    targets, baselines = [], []
+    for _ in range(max(runs, 1)):
+        targets.append(measure())
+        baselines.append(measure(BASELINE, f"import {BASELINE}")[-1]['cumulative_us'])
+    entries = min(targets, key=lambda entries: entries[-1]['cumulative_us'])
+    return entries, entries[-1]['cumulative_us'] / 1000, min(baselines) / 1000
+
+
+# Chaîne d'imports menant à l'entrée `index` : le parent d'une entrée est la suivante de profondeur inférieure
+def import_chain(entries, index):
+    chain = [entries[index]['name']]
+    depth = entries[index]['depth']
+    for entry in entries[index + 1:]:
+        if entry['depth'] < depth:
+            chain.append(entry['name'])
+            depth = entry['depth']
+    return ' <- '.join(chain)
+
+
+def is_heavy(name):
+    return any(name == module or name.startswith(f"{module}.") for module in HEAVY_MODULES)
+
+
+# Modules lourds importés au démarrage, avec leur chaîne d'imports : seul le premier module lourd de chaque chaîne
+# est signalé (pas ses propres sous-modules)
+def heavy_imports(entries):
+    found = []
+    for index, entry in enumerate(entries):
+        chain = import_chain(entries, index)
+        if is_heavy(entry['name']) and not any(is_heavy(parent) for parent in chain.split(' <- ')[1:]):
+            found.append((entry, chain))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget de temps d'import de app:server (python -X importtime)")
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS,
+                        help="temps d'import cumulé maximal en ms (IMPORT_BUDGET_MS, 1500 par défaut ; 0 : non vérifié)")
+    parser.add_argument('--runs', type=int, default=RUNS, help="nombre de mesures, la plus rapide est retenue")
+    args = parser.parse_args()
+
+    runs = max(args.runs, 1)
+    entries, total_ms, baseline_ms = measure_with_baseline(runs)
+
+    print(f"Import de {TARGET}:server : {total_ms:.0f} ms (meilleure de {runs} mesures), "
+          f"{total_ms / baseline_ms:.2f} fois celui de {BASELINE} ({baseline_ms:.0f} ms)")
+    print("Imports directs les plus coûteux :")
+    direct = sorted((entry for entry in entries if entry['depth'] == 1), key=lambda entry: entry['cumulative_us'],
+                    reverse=True)
+    for entry in direct[:10]:
+        print(f"  {entry['cumulative_us'] / 1000:>8.1f} ms  {entry['name']}")
+
+    failures = [f"module lourd importé au démarrage ({entry['cumulative_us'] / 1000:.0f} ms) : {chain}"
+                for entry, chain in heavy_imports(entries)]
+    if args.budget_ms and total_ms > args.budget_ms:
+        failures.append(f"temps d'import {total_ms:.0f} ms supérieur au budget de {args.budget_ms:.0f} ms")
+    if total_ms > RELATIVE_BUDGET * baseline_ms:
+        failures.append(f"temps d'import {total_ms:.0f} ms supérieur à {RELATIVE_BUDGET} fois celui de {BASELINE} "
+                        f"({baseline_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"ÉCHEC : {failure}")
+    if not failures:
+        print(f"OK : budget de {args.budget_ms:.0f} ms respecté, aucun module lourd importé" if args.budget_ms
+              else "OK : aucun module lourd importé")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+import ast
+import contextlib
+import glob
+import hashlib
+import logging
+import os
+import stat
+import tempfile
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou, le renommage atomique reste sûr
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# --- Répertoire du cache : des fichiers pickle y sont relus, il ne doit donc être modifiable que par l'utilisateur
+# qui exécute l'application. Par défaut un répertoire par utilisateur dans le répertoire temporaire, créé en 0700 ;
+# un répertoire existant qui appartient à un autre utilisateur ou que les autres peuvent modifier est refusé ---
+def _default_cache_dir():
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    return os.path.join(tempfile.gettempdir(), f"dashboard-cache-{user}")
+
+
+def private_directory(path):
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, 'getuid'):  # Windows : pas de propriétaire POSIX à vérifier
+        info = os.lstat(path)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o022:
+            raise RuntimeError(f"Répertoire de cache refusé : {path} doit être un répertoire de l'utilisateur courant, "
+                               f"non modifiable par les autres utilisateurs (DASH_CACHE_DIR)")
+    return path
+
+
+CACHE_DIR = private_directory(os.environ.get('DASH_CACHE_DIR', _default_cache_dir()))
+
+# Les fichiers temporaires plus vieux que ce délai sont ceux d'un worker interrompu
+STALE_TMP_SECONDS = 600
+
+
+# --- Empreinte d'un fichier (lecture par blocs pour ne pas charger le fichier en mémoire) ---
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# --- Modules locaux dont dépend un module (imports analysés sans exécuter le code) ---
+def local_dependencies(module_name, seen=None):
+    seen = set() if seen is None else seen
+    path = os.path.join(ROOT_DIR, f"{module_name}.py")
+    if module_name in seen or not os.path.exists(path):
+        return seen
+    seen.add(module_name)
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            local_dependencies(name.split('.')[0], seen)
+    return seen
+
+
+# --- Clé d'une page : version du code (page + modules locaux importés), contenu des données
+# et, pour les pages qui dépendent de la date du jour, cette date (salt) ---
+def page_key(page, inputs=(), salt=''):
+    digest = hashlib.sha256(salt.encode())
+    for module_name in sorted(local_dependencies(page)):
+        digest.update(module_name.encode())
+        digest.update(file_digest(os.path.join(ROOT_DIR, f"{module_name}.py")).encode())
+    for path in sorted(inputs):
+        digest.update(path.encode())
+        # Donnée facultative absente (grille de population...) : la clé change à son arrivée
+        full_path = os.path.join(ROOT_DIR, path)
+        digest.update((file_digest(full_path) if os.path.exists(full_path) else 'absent').encode())
+    return digest.hexdigest()[:32]
+
+
+# Cache disque des layouts sérialisés, partagé entre les workers gunicorn :
+# écriture dans un fichier temporaire puis renommage atomique, verrou par page pendant la construction
+class LayoutCache:
+    def __init__(self, directory=None):
+        self.directory = os.path.join(directory or CACHE_DIR, 'layouts')
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, page, key):
+        return os.path.join(self.directory, f"{page}-{key}.json")
+
+    def load(self, page, key):
+        try:
+            with open(self._path(page, key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def store(self, page, key, data):
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{page}-", suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(page, key))
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+        self.evict(page, key)
+
+    # Supprime les entrées de la page qui ne correspondent plus à la clé courante
+    def evict(self, page, key):
+        current = self._path(page, key)
+        for path in glob.glob(os.path.join(self.directory, f"{page}-*.json")):
+            if path != current:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                    logger.info(f"Cache : entrée obsolète supprimée {os.path.basename(path)}")
+        for path in glob.glob(os.path.join(self.directory, f"{page}-*.tmp")):
+            with contextlib.suppress(FileNotFoundError):
+                if time.time() - os.path.getmtime(path) > STALE_TMP_SECONDS:
+                    os.remove(path)
+
+    @contextlib.contextmanager
+    def lock(self, page):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, f"{page}.lock"), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
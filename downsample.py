@@ -0,0 +1,103 @@
+# Sous-échantillonnage des longues séries temporelles (LTTB) et séries complètes servies au zoom.
+# Importé par les modules de pages et par le callback de zoom (zoom.py), pas au démarrage de l'application.
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from timeseries import open_series, write_series
+from zoom import lookup, register
+
+# Nombre maximal de points envoyés au navigateur par courbe, quelle que soit la longueur de l'historique
+POINT_BUDGET = int(os.environ.get('DASH_POINT_BUDGET', '1000'))
+
+
+# --- Largest-Triangle-Three-Buckets : indices des points conservés ---
+# Le premier et le dernier point sont toujours gardés ; dans chaque seau, on garde le point qui forme le plus
+# grand triangle avec le point retenu dans le seau précédent et la moyenne du seau suivant.
+def lttb(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x)
+    x = (x.astype('datetime64[ns]').view(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x).astype(float)
+    y = np.asarray(y, dtype=float)
+
+    # Bornes des seaux (le premier et le dernier point forment chacun leur propre seau)
+    edges = np.floor(np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    starts = edges[:-1]
+
+    # Moyennes de chaque seau (calculées une fois, en ignorant les valeurs manquantes)
+    valid = ~np.isnan(y)
+    counts = np.add.reduceat(valid[:-1].astype(float), starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_x = np.add.reduceat(x[:-1], starts) / np.diff(edges)
+        avg_y = np.add.reduceat(np.where(valid, y, 0.0)[:-1], starts) / counts
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        selected[i + 1] = a
+    return selected
+
+
+# --- Points d'une série complète compris dans une plage de x, réduits au budget ---
+def window(key, start=None, end=None, threshold=POINT_BUDGET):
+    series = _full_series(key)
+    if series is None:
+        return None
+    x, y = series
+    lo = 0 if start is None else np.searchsorted(x, np.datetime64(pd.Timestamp(start)), side='left')
+    hi = len(x) if end is None else np.searchsorted(x, np.datetime64(pd.Timestamp(end)), side='right')
+    # Un point de part et d'autre de la plage pour que la courbe atteigne les bords du graphique
+    lo, hi = max(lo - 1, 0), min(hi + 1, len(x))
+    index = lo + lttb(x[lo:hi], y[lo:hi], threshold)
+    return x[index], y[index]
+
+
+def _store_name(key):
+    return f"graph-{key.replace(':', '-')}"
+
+
+# Série complète (dates, valeurs) d'un graphique, None si elle n'a jamais été écrite (cache disque vidé)
+def _full_series(key):
+    store = lookup(key)
+    if store is None:
+        # Layout relu depuis le cache : la série est celle écrite par le worker qui a construit la page
+        store = open_series(_store_name(key))
+        if store is None:
+            return None
+        register(key, store)
+    return store.dates.view('datetime64[D]'), store['y']
+
+
+# Écriture de la série complète d'un graphique, sauf si la version courante sur disque a le même contenu
+def _persist(key, x, y):
+    digest = hashlib.sha256(x.tobytes())
+    digest.update(y.tobytes())
+    version = digest.hexdigest()[:32]
+    store = open_series(_store_name(key), version)
+    return store if store is not None else write_series(_store_name(key), x, {'y': y}, version=version)
+
+
+# Courbe plotly express d'une série temporelle quotidienne : la figure initiale ne contient qu'une vue d'ensemble
+# au budget de points, la série complète est conservée côté serveur pour le zoom
+def downsampled_line(df, x, y, key, **kwargs):
+    df = df.sort_values(x)
+    register(key, _persist(key, df[x].to_numpy(dtype='datetime64[ns]'), df[y].to_numpy(dtype=float)))
+    index = lttb(df[x].to_numpy(), df[y].to_numpy(dtype=float), POINT_BUDGET)
+    figure = px.line(df.iloc[index], x=x, y=y, **kwargs)
+    # Révision d'interface fixe : les données remplacées par le callback de zoom (Patch) ne réinitialisent
+    # ni la plage affichée ni les traces masquées dans la légende
+    figure.update_layout(uirevision=key)
+    return figure
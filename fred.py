@@ -0,0 +1,165 @@
+# Mise à jour incrémentale des séries FRED de data/ : seules les observations postérieures à la dernière date
+# du fichier sont demandées (requêtes conditionnelles), puis ajoutées en fin de fichier sans le réécrire.
+# Lancement depuis la racine du dépôt : python -m fred [SERIE ...] [--base-url URL]
+import argparse
+import csv
+import datetime
+import io
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cache import CACHE_DIR, ROOT_DIR
+
+logger = logging.getLogger(__name__)
+
+# URL de téléchargement CSV de FRED, remplaçable (serveur de test local) par FRED_BASE_URL ou --base-url
+BASE_URL = os.environ.get('FRED_BASE_URL', 'https://fred.stlouisfed.org/graph/fredgraph.csv')
+SERIES = {
+    'T10YIE': 'data/T10YIE.csv',
+    'M2SL': 'data/M2SL.csv',
+    'WTISPLC': 'data/WTISPLC.csv',
+}
+DATE_COLUMN = 'observation_date'
+# Validateurs HTTP (ETag, Last-Modified) de la dernière réponse de chaque série
+STATE_PATH = os.path.join(CACHE_DIR, 'fred', 'state.json')
+TIMEOUT = 30
+TAIL_BLOCK = 4096
+
+
+# --- Dernière ligne d'un fichier, lue depuis la fin (sans parcourir tout le fichier) ---
+def last_line(path):
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        position, data = end, b''
+        while position > 0 and data.rstrip(b'\r\n').count(b'\n') < 1:
+            position = max(position - TAIL_BLOCK, 0)
+            f.seek(position)
+            data = f.read(end - position)
+    return data.rstrip(b'\r\n').rsplit(b'\n', 1)[-1].decode(), data.endswith(b'\n')
+
+
+def last_observation(path):
+    line, _ = last_line(path)
+    value = line.split(',', 1)[0]
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        return None  # Fichier sans observation (en-tête seul)
+
+
+def load_state():
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(STATE_PATH))
+    with os.fdopen(fd, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def create_session(pool_size=len(SERIES)):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# --- Observations postérieures à `since` dans une réponse CSV au format FRED ---
+def new_rows(text, series, since):
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if header is None or header[:2] != [DATE_COLUMN, series]:
+        raise ValueError(f"{series} : en-tête inattendu {header}")
+    rows = []
+    for row in reader:
+        if len(row) < 2:
+            continue
+        date = datetime.date.fromisoformat(row[0])
+        if since is None or date > since:
+            # Valeur manquante : FRED écrit "." ou une chaîne vide, le fichier garde une valeur vide
+            rows.append((row[0], '' if row[1] == '.' else row[1]))
+    return rows
+
+
+def update_series(session, series, path, validators, base_url=BASE_URL):
+    full_path = os.path.join(ROOT_DIR, path)
+    since = last_observation(full_path)
+    params = {'id': series}
+    if since is not None:
+        params['cosd'] = (since + datetime.timedelta(days=1)).isoformat()
+    headers = {}
+    if validators.get('since') == params.get('cosd'):
+        # Mêmes paramètres que la requête précédente : la réponse peut être revalidée
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+    response = session.get(base_url, params=params, headers=headers, timeout=TIMEOUT)
+    if response.status_code == 304:
+        return 0, validators
+    response.raise_for_status()
+    rows = new_rows(response.text, series, since)
+    if rows:
+        # Ajout en fin de fichier : les lignes existantes ne sont pas réécrites
+        _, newline = last_line(full_path)
+        with open(full_path, 'a', newline='') as f:
+            if not newline:
+                f.write('\n')
+            f.write(''.join(f"{date},{value}\n" for date, value in rows))
+        # Le fichier a changé : la prochaine requête part d'une nouvelle date, sans validateurs
+        return len(rows), {}
+    return 0, {'since': params.get('cosd'), 'etag': response.headers.get('ETag'),
+               'last_modified': response.headers.get('Last-Modified')}
+
+
+# Met à jour plusieurs séries en parallèle (une connexion par série dans le pool de la session)
+def update_all(series=None, base_url=BASE_URL):
+    series = list(series or SERIES)
+    state = load_state()
+    results = {}
+    with create_session(len(series)) as session, ThreadPoolExecutor(max_workers=len(series)) as executor:
+        futures = {name: executor.submit(update_series, session, name, SERIES[name], state.get(name, {}), base_url)
+                   for name in series}
+        for name, future in futures.items():
+            try:
+                added, state[name] = future.result()
+            except (requests.RequestException, ValueError) as e:
+                logger.error(f"{name} : mise à jour impossible ({e})")
+                results[name] = None
+                continue
+            results[name] = added
+            logger.info(f"{name} : {added} nouvelle(s) observation(s)" if added else f"{name} : à jour")
+    save_state(state)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mise à jour incrémentale des séries FRED de data/")
+    parser.add_argument('series', nargs='*', help=f"séries à mettre à jour parmi {', '.join(SERIES)} (toutes par défaut)")
+    parser.add_argument('--base-url', default=BASE_URL, help="URL du téléchargement CSV (FRED_BASE_URL)")
+    args = parser.parse_args()
+    unknown = set(args.series) - set(SERIES)
+    if unknown:
+        parser.error(f"séries inconnues : {', '.join(sorted(unknown))}")
+    logging.basicConfig(level=logging.INFO)
+    results = update_all(args.series, args.base_url)
+    return 1 if None in results.values() else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+# Géométrie sur la sphère terrestre pour les tracés scattergeo : cercles (rayons autour d'un point) et arcs de grand
+# cercle calculés sur des tableaux NumPy entiers, mémorisés par centre, rayon et résolution.
+# Les tracés multiples sont renvoyés dans un seul couple (lat, lon), séparés par des NaN (coupures de ligne pour
+# plotly), et coupés à l'antiméridien pour ne pas traverser toute la carte.
+from functools import lru_cache
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+# Nombre de points par cercle ou par arc
+RESOLUTION = 100
+CACHE_SIZE = 256
+
+
+# --- Points à une distance et dans des directions données (formule directe sur la sphère), en degrés.
+# Les arguments sont diffusés (broadcasting) : un centre et n directions, n centres et n rayons, etc. ---
+def destination(lat, lon, distance_km, bearing):
+    lat_rad = np.radians(lat)
+    lon_rad = np.radians(lon)
+    angular_distance = np.asarray(distance_km, dtype=np.float64) / EARTH_RADIUS_KM
+    bearing = np.asarray(bearing, dtype=np.float64)
+    sin_lat, cos_lat = np.sin(lat_rad), np.cos(lat_rad)
+    sin_distance, cos_distance = np.sin(angular_distance), np.cos(angular_distance)
+    lat_new = np.arcsin(sin_lat * cos_distance + cos_lat * sin_distance * np.cos(bearing))
+    lon_new = lon_rad + np.arctan2(np.sin(bearing) * sin_distance * cos_lat,
+                                   cos_distance - sin_lat * np.sin(lat_new))
+    return np.degrees(lat_new), np.degrees(lon_new)
+
+
+def _normalize_longitude(lon):
+    return np.where((lon < -180) | (lon > 180), (lon + 180) % 360 - 180, lon)
+
+
+# --- Coupure à l'antiméridien : longitudes ramenées dans [-180, 180], et un segment qui passe de +180 à -180
+# (ou l'inverse) est fermé de part et d'autre de la ligne de changement de date puis interrompu (NaN) ---
+def split_antimeridian(lats, lons):
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = _normalize_longitude(np.asarray(lons, dtype=np.float64))
+    jumps = np.flatnonzero(np.abs(np.diff(lons)) > 180)
+    if not len(jumps):
+        return lats, lons
+    before_lat, after_lat = lats[jumps], lats[jumps + 1]
+    before_lon, after_lon = lons[jumps], lons[jumps + 1]
+    # Côté du point de départ, et longitude d'arrivée déroulée pour interpoler la latitude au passage
+    side = np.where(before_lon > 0, 180.0, -180.0)
+    unwrapped = after_lon + 2 * side
+    fraction = np.divide(side - before_lon, unwrapped - before_lon,
+                         out=np.zeros(len(jumps)), where=unwrapped != before_lon)
+    crossing_lat = before_lat + fraction * (after_lat - before_lat)
+    insert_lat = np.column_stack([crossing_lat, np.full(len(jumps), np.nan), crossing_lat]).ravel()
+    insert_lon = np.column_stack([side, np.full(len(jumps), np.nan), -side]).ravel()
+    positions = np.repeat(jumps + 1, 3)
+    return np.insert(lats, positions, insert_lat), np.insert(lons, positions, insert_lon)
+
+
+def _join(lats, lons):
+    # Lignes (n, points) mises bout à bout, séparées par un NaN
+    gaps = np.full((lats.shape[0], 1), np.nan)
+    return np.hstack([lats, gaps]).ravel()[:-1], np.hstack([lons, gaps]).ravel()[:-1]
+
+
+def _frozen(lats, lons):
+    lats, lons = split_antimeridian(lats, lons)
+    lats.flags.writeable = False
+    lons.flags.writeable = False
+    return lats, lons
+
+
+# --- Cercles : plusieurs centres et rayons (anneaux) en un seul calcul, une ligne par triplet (lat, lon, rayon) ---
+@lru_cache(maxsize=CACHE_SIZE)
+def _circles(specs, resolution):
+    specs = np.array(specs, dtype=np.float64).reshape(-1, 3)
+    angles = np.linspace(0, 2 * np.pi, resolution)
+    lats, lons = destination(specs[:, 0:1], specs[:, 1:2], specs[:, 2:3], angles[None, :])
+    return _frozen(*_join(lats, lons))
+
+
+# Cercle de rayon radius_km autour de (lat, lon) : tableaux de latitudes et longitudes (en lecture seule,
+# partagés par le cache)
+def circle(lat, lon, radius_km, resolution=RESOLUTION):
+    return _circles(((float(lat), float(lon), float(radius_km)),), resolution)
+
+
+# Anneaux concentriques : un cercle par rayon, dans un seul tracé
+def rings(lat, lon, radii_km, resolution=RESOLUTION):
+    return _circles(tuple((float(lat), float(lon), float(radius)) for radius in radii_km), resolution)
+
+
+# Cercles autour de plusieurs centres [(lat, lon), ...] : même rayon pour tous, ou un rayon par centre
+def circles(centers, radius_km, resolution=RESOLUTION):
+    centers = [(float(lat), float(lon)) for lat, lon in centers]
+    radii = [float(radius_km)] * len(centers) if np.ndim(radius_km) == 0 else [float(r) for r in radius_km]
+    if len(radii) != len(centers):
+        raise ValueError("un rayon par centre est attendu")
+    return _circles(tuple((lat, lon, radius) for (lat, lon), radius in zip(centers, radii)), resolution)
+
+
+# --- Arcs de grand cercle (interpolation sphérique) entre des couples de points [((lat1, lon1), (lat2, lon2)), ...] ---
+@lru_cache(maxsize=CACHE_SIZE)
+def _great_circles(paths, resolution):
+    points = np.radians(np.array(paths, dtype=np.float64).reshape(-1, 2, 2))
+    lat, lon = points[..., 0], points[..., 1]
+    # Vecteurs unitaires des extrémités : (n, 2, 3)
+    xyz = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+    start, end = xyz[:, 0, :], xyz[:, 1, :]
+    omega = np.arccos(np.clip(np.einsum('ij,ij->i', start, end), -1.0, 1.0))[:, None, None]
+    t = np.linspace(0, 1, resolution)[None, :, None]
+    sin_omega = np.sin(omega)
+    # Points confondus (omega nul) : segment constant
+    safe = np.where(sin_omega == 0, 1.0, sin_omega)
+    weight_start = np.where(sin_omega == 0, 1 - t, np.sin((1 - t) * omega) / safe)
+    weight_end = np.where(sin_omega == 0, t, np.sin(t * omega) / safe)
+    path = weight_start * start[:, None, :] + weight_end * end[:, None, :]
+    lats = np.degrees(np.arcsin(np.clip(path[..., 2], -1.0, 1.0)))
+    lons = np.degrees(np.arctan2(path[..., 1], path[..., 0]))
+    return _frozen(*_join(lats, lons))
+
+
+def great_circle(start, end, resolution=RESOLUTION):
+    return great_circles([(start, end)], resolution)
+
+
+def great_circles(paths, resolution=RESOLUTION):
+    paths = tuple(((float(a[0]), float(a[1])), (float(b[0]), float(b[1]))) for a, b in paths)
+    return _great_circles(paths, resolution)
@@ -0,0 +1,34 @@
+# Configuration gunicorn (chargée automatiquement depuis le répertoire de l'application)
+import os
+import logging
+
+import metrics
+from memory import memory_report, format_memory_report
+
+logger = logging.getLogger('gunicorn.error')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8050')}"
+workers = int(os.environ.get('GUNICORN_WORKERS', '4'))
+timeout = 120
+
+# DASH_PRELOAD=1 : l'application (et toutes les pages) est construite une seule fois dans le maître,
+# puis partagée en copie sur écriture par les workers
+preload_app = os.environ.get('DASH_PRELOAD') == '1'
+
+
+def when_ready(server):
+    # Les compteurs agrégés sur /metrics repartent de zéro à chaque démarrage du serveur
+    metrics.reset_directory()
+    metrics.dump(force=True)
+    server.log.info(f"Maître prêt (preload={preload_app}) : {format_memory_report(memory_report())}")
+
+
+def post_worker_init(worker):
+    metrics.reset()
+    worker.log.info(f"Worker {worker.pid} démarré : {format_memory_report(memory_report())}")
+
+
+def worker_exit(server, worker):
+    # Dernier instantané des métriques du worker, conservé pour l'agrégation
+    metrics.dump(force=True)
+    server.log.info(f"Worker {worker.pid} arrêté : {format_memory_report(memory_report())}")
@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+import flask
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : gzip reste disponible
+    brotli = None
+
+# En dessous de cette taille, la compression ne fait pas gagner de temps de transfert
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'text/html', 'text/css', 'text/plain')
+# Niveaux de compression : maximal pour les réponses GET (layout, dépendances), revalidées par ETag et servies
+# depuis le cache des corps compressés ; modéré pour les réponses des callbacks (POST), calculées à chaque
+# requête et compressées dans le temps de réponse
+LEVELS = {'GET': {'br': 9, 'gzip': 9}, 'POST': {'br': 5, 'gzip': 6}}
+
+# Corps compressés déjà calculés, par (empreinte, encodage, niveau) : une page déjà servie n'est pas recompressée
+_compressed = OrderedDict()
+_compressed_lock = threading.Lock()
+COMPRESSED_CACHE_SIZE = 64
+
+
+def _negotiate(accept_encoding):
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ('br', 'gzip'):
+        if encoding == 'br' and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def _compress(digest, encoding, level, body):
+    key = (digest, encoding, level)
+    with _compressed_lock:
+        if key in _compressed:
+            _compressed.move_to_end(key)
+            metrics.cache_access('compressed', hit=True)
+            return _compressed[key]
+    metrics.cache_access('compressed', hit=False)
+    if encoding == 'br':
+        data = brotli.compress(body, quality=level)
+    else:
+        data = gzip.compress(body, compresslevel=level, mtime=0)
+    with _compressed_lock:
+        _compressed[key] = data
+        while len(_compressed) > COMPRESSED_CACHE_SIZE:
+            _compressed.popitem(last=False)
+    return data
+
+
+# Compression (brotli ou gzip selon Accept-Encoding) et, pour les GET, ETag fort calculé sur le contenu.
+# Les GET conditionnels (layout, dépendances) reçoivent un 304 si le contenu n'a pas changé. Les réponses des
+# callbacks (POST) n'ont pas d'ETag : un POST n'est jamais revalidé par le navigateur. Elles profitent seulement
+# du cache des corps compressés (même changement de page demandé plusieurs fois).
+def install(server):
+    @server.after_request
+    def compress_and_tag(response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or not response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+            return response
+
+        body = response.get_data()
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        response.vary.add('Accept-Encoding')
+
+        request = flask.request
+        cacheable = request.method in ('GET', 'HEAD')
+        if cacheable:
+            for tag in (digest, f"{digest}-br", f"{digest}-gzip"):
+                if request.if_none_match.contains(tag):
+                    response.status_code = 304
+                    response.set_data(b'')
+                    response.set_etag(tag)
+                    return response
+
+        encoding = _negotiate(request.headers.get('Accept-Encoding'))
+        if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+            if cacheable:
+                response.set_etag(digest)
+            return response
+
+        level = LEVELS['GET' if cacheable else 'POST'][encoding]
+        response.set_data(_compress(digest, encoding, level, body))
+        response.headers['Content-Encoding'] = encoding
+        if cacheable:
+            # Chaque représentation compressée a son propre ETag fort
+            response.set_etag(f"{digest}-{encoding}")
+        return response
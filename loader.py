@@ -0,0 +1,70 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+
+import pandas as pd
+
+import metrics
+from cache import CACHE_DIR, ROOT_DIR, file_digest
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_DIR = os.path.join(CACHE_DIR, 'data')
+
+
+# --- Chemin du fichier binaire associé à un CSV et à ses options de lecture ---
+def _sidecar_path(path, kwargs):
+    options = json.dumps(kwargs, sort_keys=True, default=str)
+    key = hashlib.sha256(f"{os.path.abspath(path)}|{options}|{pd.__version__}".encode()).hexdigest()[:16]
+    return os.path.join(SIDECAR_DIR, f"{os.path.basename(path)}-{key}.pkl")
+
+
+def _write_sidecar(sidecar, entry):
+    os.makedirs(SIDECAR_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=SIDECAR_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, sidecar)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Lecture d'un CSV de data/ : le DataFrame typé est conservé dans un fichier binaire (pickle) à côté du cache,
+# les lectures suivantes ne reparsent pas le CSV. Le fichier binaire est reconstruit si la date de modification
+# ou la taille du CSV change et que son contenu (sha256) est différent.
+def read_csv(path, **kwargs):
+    full_path = path if os.path.isabs(path) else os.path.join(ROOT_DIR, path)
+    stat = os.stat(full_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    sidecar = _sidecar_path(full_path, kwargs)
+
+    entry = None
+    try:
+        with open(sidecar, 'rb') as f:
+            entry = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        pass
+
+    if entry is not None and entry['signature'] == signature:
+        metrics.cache_access('data', hit=True)
+        return entry['frame']
+
+    digest = file_digest(full_path)
+    if entry is not None and entry['sha256'] == digest:
+        # Fichier touché mais contenu inchangé : seule la signature est mise à jour
+        entry['signature'] = signature
+        _write_sidecar(sidecar, entry)
+        metrics.cache_access('data', hit=True)
+        return entry['frame']
+
+    metrics.cache_access('data', hit=False)
+    frame = pd.read_csv(full_path, **kwargs)
+    _write_sidecar(sidecar, {'signature': signature, 'sha256': digest, 'frame': frame})
+    logger.info(f"Données : {path} converti en cache binaire")
+    return frame
@@ -0,0 +1,26 @@
+import os
+
+
+# --- Mémoire du processus courant (Linux) : RSS, PSS et pages partagées/privées en ko ---
+# PSS répartit les pages partagées entre les processus qui les utilisent :
+# c'est la mesure pertinente pour comparer les workers avec et sans préchargement
+def memory_report(pid=None):
+    pid = pid or os.getpid()
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared_clean', 'Shared_Dirty': 'shared_dirty',
+              'Private_Clean': 'private_clean', 'Private_Dirty': 'private_dirty'}
+    report = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in fields:
+                    report[fields[name]] = int(value.split()[0])
+    except OSError:
+        pass
+    return report
+
+
+def format_memory_report(report):
+    if not report:
+        return "mémoire non disponible"
+    return ', '.join(f"{name}={value / 1024:.1f} Mo" for name, value in report.items())
@@ -0,0 +1,291 @@
+import bisect
+import contextlib
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Chaque worker écrit ses compteurs dans METRICS_DIR/<pid>.json ; /metrics additionne les fichiers de tous les workers
+METRICS_DIR = os.environ.get('DASH_METRICS_DIR', os.path.join(CACHE_DIR, 'metrics'))
+# Intervalle minimal entre deux écritures du fichier d'un worker (secondes)
+DUMP_INTERVAL = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1000, 5000, 10000, 50000, 100000, 500000, 1000000, 5000000)
+# Étiquette des requêtes de callback dont la sortie n'est pas déclarée (même repli que la route 'inconnue')
+UNKNOWN_CALLBACK = 'inconnu'
+
+
+# --- Familles de métriques (un verrou par famille, les étiquettes sont des tuples triés) ---
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return [[dict(key), value] for key, value in self._values.items()]
+
+    @staticmethod
+    def merge(total, value):
+        return (total or 0) + value
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            state['counts'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return [[dict(key), {'counts': list(state['counts']), 'sum': state['sum'], 'count': state['count']}]
+                    for key, state in self._values.items()]
+
+    @staticmethod
+    def merge(total, value):
+        if total is None:
+            return {'counts': list(value['counts']), 'sum': value['sum'], 'count': value['count']}
+        total['counts'] = [a + b for a, b in zip(total['counts'], value['counts'])]
+        total['sum'] += value['sum']
+        total['count'] += value['count']
+        return total
+
+
+_families = {}
+_families_lock = threading.Lock()
+
+
+def _family(cls, name, help, **kwargs):
+    with _families_lock:
+        family = _families.get(name)
+        if family is None:
+            family = _families[name] = cls(name, help, **kwargs)
+        return family
+
+
+def counter(name, help):
+    return _family(Counter, name, help)
+
+
+def histogram(name, help, buckets=LATENCY_BUCKETS):
+    return _family(Histogram, name, help, buckets=buckets)
+
+
+REQUEST_SECONDS = histogram('dash_http_request_seconds', "Durée des requêtes HTTP par route")
+CALLBACK_SECONDS = histogram('dash_callback_seconds', "Durée des callbacks Dash côté serveur")
+PAGE_REQUEST_SECONDS = histogram('dash_page_request_seconds', "Durée des requêtes de changement de page, par page")
+RESPONSE_BYTES = histogram('dash_response_bytes', "Taille des réponses envoyées (après compression)",
+                           buckets=SIZE_BUCKETS)
+PAGE_BUILD_SECONDS = histogram('dash_page_build_seconds', "Temps de construction (ou de lecture en cache) des pages")
+CACHE_REQUESTS = counter('dash_cache_requests_total', "Accès aux caches (layouts, données, corps compressés)")
+
+
+def cache_access(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+# --- Partage entre workers : instantané JSON par processus, agrégé à la lecture ---
+def snapshot():
+    with _families_lock:
+        families = list(_families.values())
+    return {family.name: {'type': family.type, 'help': family.help, 'buckets': list(getattr(family, 'buckets', ())),
+                          'samples': family.snapshot()}
+            for family in families}
+
+
+_dirty = threading.Event()
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+_dump_lock = threading.Lock()
+
+
+def _write():
+    with _dump_lock:
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=METRICS_DIR)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(snapshot(), f)
+            os.replace(tmp_path, os.path.join(METRICS_DIR, f"{os.getpid()}.json"))
+        except OSError as e:
+            logger.warning(f"Métriques : écriture impossible dans {METRICS_DIR} ({e})")
+
+
+def _flush_loop():
+    while True:
+        _dirty.wait()
+        time.sleep(DUMP_INTERVAL)
+        _dirty.clear()
+        _write()
+
+
+# Les requêtes ne font que signaler un changement : un thread par worker (démarré après le fork)
+# écrit l'instantané au plus une fois par DUMP_INTERVAL, hors du chemin des requêtes
+def dump(force=False):
+    global _flusher_pid
+    if force:
+        _write()
+        return
+    if _flusher_pid != os.getpid():
+        with _flusher_lock:
+            if _flusher_pid != os.getpid():
+                threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+                _flusher_pid = os.getpid()
+    _dirty.set()
+
+
+# Au démarrage du serveur (maître gunicorn) : les compteurs des exécutions précédentes sont effacés
+def reset_directory():
+    for path in glob.glob(os.path.join(METRICS_DIR, '*.json')):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+# Après le fork : les valeurs héritées du maître (pages préchargées) sont déjà dans son propre fichier
+def reset():
+    with _families_lock:
+        families = list(_families.values())
+    for family in families:
+        with family._lock:
+            family._values.clear()
+
+
+def collect():
+    dump(force=True)
+    merged = {}
+    for path in glob.glob(os.path.join(METRICS_DIR, '*.json')):
+        try:
+            with open(path) as f:
+                families = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, family in families.items():
+            cls = Histogram if family['type'] == 'histogram' else Counter
+            target = merged.setdefault(name, {**family, 'values': {}})
+            for labels, value in family['samples']:
+                key = tuple(sorted(labels.items()))
+                target['values'][key] = cls.merge(target['values'].get(key), value)
+    return merged
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in items)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + '}'
+
+
+# Format texte d'exposition Prometheus
+def render(merged):
+    lines = []
+    for name in sorted(merged):
+        family = merged[name]
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for labels, value in sorted(family['values'].items()):
+            if family['type'] == 'counter':
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(family['buckets'] + ['+Inf'], value['counts']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+# --- Instrumentation du serveur Flask et des callbacks Dash ---
+def set_page(page):
+    import flask
+    if flask.has_request_context():
+        flask.g.metrics_page = page
+
+
+def install(app):
+    import flask
+
+    server = app.server
+    callback_names = {}
+
+    # Nom de la fonction du callback : seules les sorties déclarées dans app.callback_map sont retenues, une sortie
+    # inconnue envoyée par le client ne crée ni entrée ici ni nouvelle valeur d'étiquette
+    def callback_name(output):
+        name = callback_names.get(output)
+        if name is None:
+            if output not in app.callback_map:
+                return UNKNOWN_CALLBACK
+            callback = app.callback_map[output].get('callback')
+            name = callback_names[output] = getattr(callback, '__name__', output)
+        return name
+
+    @server.before_request
+    def start_timer():
+        flask.g.metrics_start = time.perf_counter()
+
+    # Enregistré avant http_cache.install : s'exécute après la compression et mesure les octets envoyés
+    @server.after_request
+    def record(response):
+        start = flask.g.pop('metrics_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        request = flask.request
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'inconnue'
+        REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+        if request.path.endswith('/_dash-update-component'):
+            body = request.get_json(silent=True) or {}
+            name = callback_name(body.get('output', ''))
+            CALLBACK_SECONDS.observe(elapsed, callback=name)
+            if not response.is_streamed:
+                RESPONSE_BYTES.observe(response.calculate_content_length() or 0, endpoint=name)
+            page = flask.g.pop('metrics_page', None)
+            if page is not None:
+                PAGE_REQUEST_SECONDS.observe(elapsed, page=page)
+        dump()
+        return response
+
+    @server.route('/metrics')
+    def metrics_endpoint():
+        return flask.Response(render(collect()), mimetype='text/plain; version=0.0.4')
@@ -4,7 +4,7 @@ import pandas as pd
 
 # Définition du layout en grille
 grid_layout = ["a a b b", "a a b b", "c c c c", "c c c c"]
-page2 = Page(grid_layout)
+page2 = Page(grid_layout, 'page2')
 
 # Données chiffrées pour les comparaisons
 data = {
@@ -1,38 +1,23 @@
 from template import Page
+from loader import read_csv
+from worldbank import load_indicator
 import plotly.express as px
 import pandas as pd
 import numpy as np
 
 # Définition du layout en grille : a en haut à gauche, b en bas à gauche, c à droite, d en bas à droite
 grid_layout = ["a a c c", "a a c c", "b b d d", "b b d d"]
-page3 = Page(grid_layout)
-
-
-# --- Fonction pour définir la couleur de fond ---
-def update_background_color(fig):
-    fig.update_layout(
-        paper_bgcolor='#1f2a44',
-        plot_bgcolor='#1f2a44',
-        geo=dict(
-            bgcolor='#1f2a44',
-            showcountries=True,
-            countrycolor="white",
-            showland=True,
-            landcolor="#2a3f5f"
-        )
-    )
-    return fig
+page3 = Page(grid_layout, 'page3')
 
 
 # --- Partie 1 : Indice Big Mac (Carte a) ---
 try:
-    df_bigmac = pd.read_csv("data/big-mac-raw-index.csv")
+    df_bigmac = read_csv("data/big-mac-raw-index.csv", parse_dates=['date'])
 except FileNotFoundError:
     print("Erreur : Fichier 'big-mac-raw-index.csv' introuvable.")
     exit()
 
-# Conversion de la date et tri
-df_bigmac['date'] = pd.to_datetime(df_bigmac['date'])
+# Tri par date
 df_bigmac = df_bigmac.sort_values(by='date', ascending=False)
 
 # Sélectionner la donnée la plus récente pour chaque pays
@@ -81,25 +66,18 @@ fig_a = px.choropleth(
     projection="natural earth"
 )
 fig_a.update_geos(fitbounds="locations", visible=True)
-fig_a = update_background_color(fig_a)
 page3.append('a', fig_a)
 
 # --- Partie 2 : Indice de Dévaluation Relative (Carte b) ---
 try:
-    df = pd.read_csv("data/API_PA.NUS.FCRF_DS2_en_csv_v2_13510.csv", skiprows=4)
+    exchange_rates = load_indicator("data/API_PA.NUS.FCRF_DS2_en_csv_v2_13510.csv")
 except FileNotFoundError:
     print("Erreur : Fichier 'API_PA.NUS.FCRF_DS2_en_csv_v2_13510.csv' introuvable.")
     exit()
 
-# Sélectionner les colonnes pertinentes (2010-2023)
-years = [str(year) for year in range(2010, 2024)]
-df = df[['Country Name', 'Country Code'] + years].dropna(subset=years)
-df = df.rename(columns={'Country Name': 'name', 'Country Code': 'iso_a3'})
-
-# Convertir en numérique
-for year in years:
-    df[year] = pd.to_numeric(df[year], errors='coerce')
-df = df.dropna(subset=years)
+# Taux de change 2010-2023 des pays renseignés toutes les années. Les agrégats (zone euro...) participent au
+# choix des devises de référence, ceux de la liste ci-dessous sont ensuite retirés des cartes.
+df = exchange_rates.frame(2010, 2023, aggregates=True, name='name', code='iso_a3').dropna()
 
 # Calculer la variation et normaliser
 df['change_percent'] = ((df['2023'] - df['2010']) / df['2010']) * 100
@@ -134,7 +112,6 @@ fig_b = px.choropleth(
     projection="natural earth"
 )
 fig_b.update_geos(fitbounds="locations", visible=True)
-fig_b = update_background_color(fig_b)
 page3.append('b', fig_b)
 
 # --- Partie 3 : Indice des Meilleures Devises (Carte c) ---
@@ -172,7 +149,6 @@ fig_c = px.choropleth(
     projection="natural earth"
 )
 fig_c.update_geos(fitbounds="locations", visible=True)
-fig_c = update_background_color(fig_c)
 page3.append('c', fig_c)
 
 # --- Partie 4 : Graphique en barres des 10 meilleures monnaies (d) ---
@@ -1,42 +1,29 @@
 import pandas as pd
 import numpy as np
 from template import Page  # Assurez-vous que ce module existe dans votre environnement
+from loader import read_csv
+from worldbank import load_indicator
 import plotly.express as px
 import plotly.graph_objects as go
 
 
-# --- Fonction pour définir la couleur de fond ---
-def update_background_color(fig):
-    fig.update_layout(
-        paper_bgcolor='#1f2a44',
-        plot_bgcolor='#1f2a44',
-        geo=dict(
-            bgcolor='#1f2a44',
-            showcountries=True,
-            countrycolor="white",
-            showland=True,
-            landcolor="#2a3f5f"
-        )
-    )
-    return fig
-
-
 # Définir la disposition de la grille
 grid_layout = ["b b c c", "b b c c", "a a d d", "a a d d"]
-page4 = Page(grid_layout)
+page4 = Page(grid_layout, 'page4')
 
 # Charger les données depuis les fichiers CSV
-df_exchange = pd.read_csv("data/API_PA.NUS.FCRF_DS2_en_csv_v2_13510.csv", skiprows=4)
-df_exchange = df_exchange[['Country Name', 'Country Code', '2013', '2023']]
-df_exchange.columns = ['Country Name', 'Code ISO 3', 'Exchange Rate 2013', 'Exchange Rate 2023']
+exchange_rates = load_indicator("data/API_PA.NUS.FCRF_DS2_en_csv_v2_13510.csv").countries
+df_exchange = pd.DataFrame({'Code ISO 3': exchange_rates.codes,
+                            'Exchange Rate 2013': exchange_rates.column(2013),
+                            'Exchange Rate 2023': exchange_rates.column(2023)})
 
-df_default = pd.read_csv("data/defaut_note.csv")
+df_default = read_csv("data/defaut_note.csv")
 df_default.columns = ['Notation S&P', 'Probabilité de Défaut sur 10 Ans (%)']
 
-df_ratings = pd.read_csv("data/noteS&P.csv")
+df_ratings = read_csv("data/noteS&P.csv")
 df_ratings.columns = ['Pays', 'Code ISO 3', 'Notation S&P']
 
-df_yields = pd.read_csv("data/treasury_yields_with_iso3.csv")
+df_yields = read_csv("data/treasury_yields_with_iso3.csv")
 df_yields = df_yields[['Country', 'Code ISO 3', 'Rating S&P', '10Y Bond Yield']]
 df_yields['10Y Bond Yield'] = df_yields['10Y Bond Yield'].str.rstrip('%').astype(float) / 100
 
@@ -60,7 +47,6 @@ fig_a = px.choropleth(
     projection="natural earth"
 )
 fig_a.update_geos(fitbounds="locations", visible=True)
-fig_a = update_background_color(fig_a)
 page4.append('a', fig_a)
 
 # Map b : Notes de crédit par pays (inchangée)
@@ -81,7 +67,6 @@ fig_b = px.choropleth(
     projection="natural earth"
 )
 fig_b.update_geos(fitbounds="locations", visible=True)
-fig_b = update_background_color(fig_b)
 page4.append('b', fig_b)
 
 # Map c : Risque de défaut basé sur les notes (inchangée)
@@ -97,7 +82,6 @@ fig_c = px.choropleth(
     projection="natural earth"
 )
 fig_c.update_geos(fitbounds="locations", visible=True)
-fig_c = update_background_color(fig_c)
 page4.append('c', fig_c)
 
 # Calculs pour le bar graph
@@ -1,60 +1,18 @@
 import pandas as pd
 import plotly.express as px
 from template import Page  # Assurez-vous que ce module existe dans votre environnement
-import numpy as np
-
-
-# --- Fonction pour définir la couleur de fond ---
-def update_background_color(fig):
-    fig.update_layout(
-        paper_bgcolor='#1f2a44',
-        plot_bgcolor='#1f2a44',
-        geo=dict(
-            bgcolor='#1f2a44',
-            showcountries=True,
-            countrycolor="white",
-            showland=True,
-            landcolor="#2a3f5f"
-        )
-    )
-    return fig
-
-
-# --- Fonction pour calculer les points d'un cercle géodésique ---
-def calculate_circle_points(lat_center, lon_center, radius_km, num_points=100):
-    # Rayon de la Terre en km
-    R = 6371.0
-    # Distance angulaire en radians
-    angular_distance = radius_km / R
-    # Coordonnées du centre en radians
-    lat_rad = np.radians(lat_center)
-    lon_rad = np.radians(lon_center)
-
-    # Générer les points du cercle
-    angles = np.linspace(0, 2 * np.pi, num_points)
-    lats, lons = [], []
-
-    for angle in angles:
-        # Calcul des coordonnées géodésiques
-        lat_new = np.arcsin(np.sin(lat_rad) * np.cos(angular_distance) +
-                            np.cos(lat_rad) * np.sin(angular_distance) * np.cos(angle))
-        lon_new = lon_rad + np.arctan2(
-            np.sin(angle) * np.sin(angular_distance) * np.cos(lat_rad),
-            np.cos(angular_distance) - np.sin(lat_rad) * np.sin(lat_new)
-        )
-        # Conversion en degrés
-        lats.append(np.degrees(lat_new))
-        lons.append(np.degrees(lon_new))
-
-    return lats, lons
+from worldbank import load_indicator
+import geodesic
+import population
+import population_map
+from dash import dcc
 
 
 grid_layout = ["a"]
-page5 = Page(grid_layout)
+page5 = Page(grid_layout, 'page5')
 
-# Charger les données de croissance du PIB
-df_growth = pd.read_csv("data/API_NY.GDP.MKTP.KD.ZG_DS2_fr_csv_v2_17870.csv", skiprows=4)
-df_growth = df_growth[['Country Name', 'Country Code', '2019', '2020', '2021', '2022', '2023']]
+# Charger les données de croissance du PIB (pays seuls : les agrégats n'ont pas de tracé sur la carte)
+df_growth = load_indicator("data/API_NY.GDP.MKTP.KD.ZG_DS2_fr_csv_v2_17870.csv").frame(2019, 2023)
 
 # Calculer la croissance moyenne sur les années 2019 à 2023
 df_growth['Croissance Moyenne 5 Ans'] = df_growth[['2019', '2020', '2021', '2022', '2023']].mean(axis=1, skipna=True)
@@ -103,11 +61,13 @@ fig_map.add_scattergeo(
         color="white",
         symbol="circle"
     ),
-    name="Guiyang, Chine"
+    name="Guiyang, Chine",
+    uid=population_map.CENTER_TRACE_UID
 )
 
-# Calculer les points du cercle de 4100 km
-circle_lats, circle_lons = calculate_circle_points(lat_guiyang, lon_guiyang, 4100)
+# Rayon du cercle contenant 50 % de la population mondiale autour de Guiyang (4100 km sans grille de population)
+radius_km = population.radius_for_share(lat_guiyang, lon_guiyang, population.SHARE)
+circle_lats, circle_lons = geodesic.circle(lat_guiyang, lon_guiyang, radius_km)
 
 # Ajouter le cercle à la carte
 fig_map.add_scattergeo(
@@ -119,7 +79,8 @@ fig_map.add_scattergeo(
         color="yellow",
         dash="dash"
     ),
-    name="Rayon de 4100 km (50% population)"
+    name=population.circle_label(radius_km),
+    uid=population_map.CIRCLE_TRACE_UID
 )
 
 fig_map.update_geos(
@@ -139,6 +100,8 @@ fig_map.update_layout(
     )
 )
 
-fig_map = update_background_color(fig_map)
-page5.append('a', fig_map)
+# Un clic n'importe où sur la carte recentre le cercle (callbacks dans population_map.py)
+page5.append('a', fig_map, component_id=population_map.MAP_ID)
+page5.add_component(dcc.Store(id=population_map.CENTER_ID))
+page5.add_component(dcc.Store(id=population_map.TRACES_ID, data=population_map.trace_indices(fig_map)))
 layout = page5.render()
\ No newline at end of file
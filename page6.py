@@ -1,96 +1,127 @@
 import pandas as pd
-import plotly.express as px
 from template import Page
+from downsample import downsampled_line, lttb
+from zoom import graph_id
+from cache import page_key
+from timeseries import load_series, open_series, write_series
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.pipeline import make_pipeline
+from polyfit import fitted
 import plotly.graph_objects as go
 
 grid_layout = ["a a b b c c", "a a b b c c", "d d d d d d", "d d d d d d"]
-page5 = Page(grid_layout)
+page5 = Page(grid_layout, 'page6')
 
-# Charger les données
-df = pd.read_csv("data/data_hash_price.csv")
-df['Date'] = pd.to_datetime(df['Date'])
+# Série quotidienne hash rate / prix partagée entre les workers (mmap)
+hash_price = load_series('data_hash_price', 'data/data_hash_price.csv', 'Date')
 
 # Paramètres
 COUT_MATERIEL_PAR_TH_2025 = 20  # Coût en 2025 : 20 $ par TH/s
 TOTAL_BTC = 21_000_000
 MOORE_FACTOR = 2  # Doublement de la performance
 MOORE_PERIOD = 1.5  # Tous les 1,5 ans
+PROJECTION_COLUMNS = ['Cout_Materiel', 'Predicted_price', 'Predicted_lower', 'Predicted_upper', 'Final_market_price',
+                      'Market_Cap', 'Pourcentage']
+# Niveau de l'intervalle de prédiction du prix projeté, et nombre de points de ses bornes (courbes régulières)
+PREDICTION_LEVEL = 0.95
+BAND_POINTS = 200
 
-# Calcul du coût matériel dans df
-reference_date = pd.to_datetime("2025-01-01")
-df['Years_Since_Ref'] = (reference_date - df['Date']).dt.days / 365.25
-df['Cout_Materiel_Par_TH'] = COUT_MATERIEL_PAR_TH_2025 * np.power(MOORE_FACTOR, df['Years_Since_Ref'] / MOORE_PERIOD)
-df['Cout_Materiel'] = df['hash_rate'] * df['Cout_Materiel_Par_TH']
-df['Market_Cap'] = df['market_price'] * TOTAL_BTC
-df['Pourcentage'] = (df['Cout_Materiel'] / df['Market_Cap']) * 100
-df = df[df['Market_Cap'] > 0]
-
-date_range = pd.date_range(start=df['Date'].min(), end="2040-12-31", freq='D')
-df2 = pd.DataFrame({'Date': date_range})
-
-df = df.sort_values('Date')
-df2 = df2.sort_values('Date')
-df2 = pd.merge_asof(df2, df[['Date', 'Cout_Materiel']].sort_values('Date'), on='Date', direction='backward')
-
-last_date = df['Date'].max()
-# Définir les bornes de la droite
-start_cost = 15_000_000_000  # 25 milliards
-end_cost = 5_000_000_000     # 5 milliards
-end_date = pd.to_datetime("2040-12-31")
-
-# Calcul du coefficient directeur de la droite (slope)
-duration = (end_date - last_date).days
-slope = (end_cost - start_cost) / duration
-
-# Appliquer la droite linéaire après last_date
-df2['Cout_Materiel'] = np.where(
-    df2['Date'] <= last_date,
-    df2['Cout_Materiel'],
-    start_cost + slope * (df2['Date'] - last_date).dt.days
-)
-
-# --------------------------
-# Partie B : Modélisation du prix BTC avec un modèle polynomial
-# --------------------------
-start_date = pd.to_datetime("2016-03-01")
-df_train = df[df['Date'] >= start_date].copy()
-df_train['t'] = (df_train['Date'] - start_date).dt.days / 365.25
-
-degree = 2
-model = make_pipeline(PolynomialFeatures(degree), LinearRegression())
-X_train = df_train[['t']].values
-y_train = df_train['market_price'].values
-model.fit(X_train, y_train)
 
 # --------------------------
-# Partie C : Prédiction sur df2
+# Partie A : Coût matériel et projection quotidienne jusqu'en 2040
 # --------------------------
-valid_mask = df2['Date'] >= start_date
-df2['t'] = np.nan
-df2['Predicted_price'] = np.nan
-df2.loc[valid_mask, 't'] = (df2.loc[valid_mask, 'Date'] - start_date).dt.days / 365.25
-df2.loc[valid_mask, 'Predicted_price'] = model.predict(df2.loc[valid_mask, ['t']].values)
-
-# --------------------------
-# Partie D : Construction de la courbe finale du prix BTC
-# --------------------------
-df_prices = df[['Date', 'market_price']].sort_values('Date')
-df2 = pd.merge_asof(df2.sort_values('Date'), df_prices, on='Date', direction='backward')
-df2['Final_market_price'] = np.where(df2['Date'] <= last_date, df2['market_price'], df2['Predicted_price'])
-df2['Market_Cap'] = df2['Final_market_price'] * TOTAL_BTC
-
-df2['Pourcentage'] = (df2['Cout_Materiel'] / df2['Market_Cap']) * 100
-df2 = df2[df2['Market_Cap'] > 0]  # Filtrer les divisions par zéro
+def build_projection(df):
+    # Calcul du coût matériel dans df
+    reference_date = pd.to_datetime("2025-01-01")
+    df['Years_Since_Ref'] = (reference_date - df['Date']).dt.days / 365.25
+    df['Cout_Materiel_Par_TH'] = COUT_MATERIEL_PAR_TH_2025 * np.power(MOORE_FACTOR, df['Years_Since_Ref'] / MOORE_PERIOD)
+    df['Cout_Materiel'] = df['hash_rate'] * df['Cout_Materiel_Par_TH']
+    df['Market_Cap'] = df['market_price'] * TOTAL_BTC
+    df['Pourcentage'] = (df['Cout_Materiel'] / df['Market_Cap']) * 100
+    df = df[df['Market_Cap'] > 0]
+
+    date_range = pd.date_range(start=df['Date'].min(), end="2040-12-31", freq='D')
+    df2 = pd.DataFrame({'Date': date_range})
+
+    df = df.sort_values('Date')
+    df2 = df2.sort_values('Date')
+    df2 = pd.merge_asof(df2, df[['Date', 'Cout_Materiel']].sort_values('Date'), on='Date', direction='backward')
+
+    last_date = df['Date'].max()
+    # Définir les bornes de la droite
+    start_cost = 15_000_000_000  # 25 milliards
+    end_cost = 5_000_000_000     # 5 milliards
+    end_date = pd.to_datetime("2040-12-31")
+
+    # Calcul du coefficient directeur de la droite (slope)
+    duration = (end_date - last_date).days
+    slope = (end_cost - start_cost) / duration
+
+    # Appliquer la droite linéaire après last_date
+    df2['Cout_Materiel'] = np.where(
+        df2['Date'] <= last_date,
+        df2['Cout_Materiel'],
+        start_cost + slope * (df2['Date'] - last_date).dt.days
+    )
+
+    # --------------------------
+    # Partie B : Modélisation du prix BTC avec un modèle polynomial
+    # --------------------------
+    start_date = pd.to_datetime("2016-03-01")
+    df_train = df[df['Date'] >= start_date].copy()
+    df_train['t'] = (df_train['Date'] - start_date).dt.days / 365.25
+
+    # Moindres carrés NumPy (polyfit.py) : l'ajustement enregistré est réutilisé, et seules les nouvelles
+    # observations lui sont ajoutées quand la série s'allonge
+    degree = 2
+    model = fitted('page6_market_price', df_train['t'].values, df_train['market_price'].values, degree)
+
+    # --------------------------
+    # Partie C : Prédiction sur df2
+    # --------------------------
+    valid_mask = df2['Date'] >= start_date
+    df2['t'] = np.nan
+    df2['Predicted_price'] = np.nan
+    df2.loc[valid_mask, 't'] = (df2.loc[valid_mask, 'Date'] - start_date).dt.days / 365.25
+    df2.loc[valid_mask, 'Predicted_price'] = model.predict(df2.loc[valid_mask, 't'].values)
+
+    # Intervalle de prédiction, sur la seule partie projetée (après la dernière observation)
+    df2['Predicted_lower'] = np.nan
+    df2['Predicted_upper'] = np.nan
+    projected_mask = valid_mask & (df2['Date'] > last_date)
+    bands = model.interval(df2.loc[projected_mask, 't'].values, PREDICTION_LEVEL)
+    if bands is not None:
+        df2.loc[projected_mask, 'Predicted_lower'] = np.maximum(bands[0], 0)  # Un prix reste positif
+        df2.loc[projected_mask, 'Predicted_upper'] = bands[1]
+
+    # --------------------------
+    # Partie D : Construction de la courbe finale du prix BTC
+    # --------------------------
+    df_prices = df[['Date', 'market_price']].sort_values('Date')
+    df2 = pd.merge_asof(df2.sort_values('Date'), df_prices, on='Date', direction='backward')
+    df2['Final_market_price'] = np.where(df2['Date'] <= last_date, df2['market_price'], df2['Predicted_price'])
+    df2['Market_Cap'] = df2['Final_market_price'] * TOTAL_BTC
+
+    df2['Pourcentage'] = (df2['Cout_Materiel'] / df2['Market_Cap']) * 100
+    df2 = df2[df2['Market_Cap'] > 0]  # Filtrer les divisions par zéro
+    return df2
+
+
+# La projection quotidienne est elle-même stockée en mmap et partagée entre les workers :
+# elle n'est recalculée que si les données ou le code de la page changent
+projection_version = f"{hash_price.version}-{page_key('page6')}"
+projection = open_series('page6_projection', projection_version)
+if projection is None:
+    df2 = build_projection(hash_price.to_frame('Date'))
+    projection = write_series('page6_projection', df2['Date'], {column: df2[column] for column in PROJECTION_COLUMNS},
+                              version=projection_version)
+df2 = projection.to_frame('Date')
 
 # Créer le premier graphique (Pourcentage) - Couleur bleue
-fig1 = px.line(
+fig1 = downsampled_line(
     df2,
     x='Date',
     y='Pourcentage',
+    key='page6:pourcentage',
     title='Coût Matériel par Rapport à la Capitalisation BTC',
     labels={'Pourcentage': 'Pourcentage (%)', 'Date': 'Date'},
     color_discrete_sequence=['#00A1D6']  # Bleu cyan
@@ -117,10 +148,11 @@ fig1.update_layout(
 )
 
 # Créer le deuxième graphique (Coût Matériel) - Couleur verte
-fig2 = px.line(
+fig2 = downsampled_line(
     df2,
     x='Date',
     y='Cout_Materiel',
+    key='page6:cout_materiel',
     title='Évolution du Coût Matériel du réseau BTC',
     labels={'Cout_Materiel': 'Coût Matériel ($)', 'Date': 'Date'},
     color_discrete_sequence=['#00CC96']  # Vert émeraude
@@ -147,10 +179,11 @@ fig2.update_layout(
 )
 
 # Créer le troisième graphique (Market Cap) - Couleur violette
-fig3 = px.line(
+fig3 = downsampled_line(
     df2,
     x='Date',
     y='Market_Cap',
+    key='page6:market_cap',
     title='Évolution de la Capitalisation Totale BTC',
     labels={'Market_Cap': 'Capitalisation ($)', 'Date': 'Date'},
     color_discrete_sequence=['#9B59B6']  # Violet
@@ -176,9 +209,34 @@ fig3.update_layout(
     yaxis=dict(gridcolor='rgba(255,255,255,0.1)', zerolinecolor='rgba(255,255,255,0.2)')
 )
 
-page5.append('c', fig1)
-page5.append('a', fig2)
-page5.append('b', fig3)
+# Intervalle de prédiction du prix projeté, en capitalisation, autour de la courbe (bornes réduites à BAND_POINTS
+# points ; le zoom ne recharge que la courbe principale)
+df_bands = df2.dropna(subset=['Predicted_upper'])
+if len(df_bands):
+    df_bands = df_bands.iloc[lttb(df_bands['Date'].to_numpy(), df_bands['Predicted_upper'].to_numpy(), BAND_POINTS)]
+    fig3.add_trace(go.Scatter(
+        x=df_bands['Date'],
+        y=df_bands['Predicted_upper'] * TOTAL_BTC,
+        mode='lines',
+        line=dict(width=0),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+    fig3.add_trace(go.Scatter(
+        x=df_bands['Date'],
+        y=df_bands['Predicted_lower'] * TOTAL_BTC,
+        mode='lines',
+        line=dict(width=0),
+        fill='tonexty',
+        fillcolor='rgba(155, 89, 182, 0.25)',
+        hoverinfo='skip',
+        name=f"Intervalle de prédiction {PREDICTION_LEVEL:.0%}"
+    ))
+    fig3.update_layout(showlegend=True, legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01))
+
+page5.append('c', fig1, component_id=graph_id('page6:pourcentage'))
+page5.append('a', fig2, component_id=graph_id('page6:cout_materiel'))
+page5.append('b', fig3, component_id=graph_id('page6:market_cap'))
 
 fig = go.Figure()
 
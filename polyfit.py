@@ -0,0 +1,195 @@
+# Ajustement polynomial par moindres carrés (NumPy) conservé dans le cache disque avec l'empreinte des données
+# d'entraînement : tant que les données ne changent pas, aucun calcul n'est refait, et des observations ajoutées
+# en fin de série ne font que mettre à jour l'ajustement existant (équations normales).
+# scikit-learn n'est importé que si un autre modèle est demandé (DASH_FIT_MODEL=linear, ridge ou huber).
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from statistics import NormalDist
+
+import numpy as np
+
+from cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+FIT_DIR = os.path.join(CACHE_DIR, 'fits')
+# "numpy" : moindres carrés (équations normales), sans dépendance
+MODEL = os.environ.get('DASH_FIT_MODEL', 'numpy')
+# Observations de fin de série contrôlées avant de compléter un ajustement enregistré (voir series_checksum)
+CHECK_POINTS = 64
+
+
+# Estimateurs scikit-learn (importés à la demande), précédés des variables polynomiales de même degré
+def _sklearn_estimator(model):
+    if model == 'linear':
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression()
+    if model == 'ridge':
+        from sklearn.linear_model import Ridge
+        return Ridge()
+    if model == 'huber':
+        from sklearn.linear_model import HuberRegressor
+        return HuberRegressor(max_iter=1000)
+    raise ValueError(f"Modèle d'ajustement inconnu : {model}")
+
+
+# --- Moindres carrés par équations normales, mis à jour en ligne : X'X, X'y et y'y suffisent à retrouver les
+# coefficients, leur covariance et la variance résiduelle. Chaque observation ajoutée coûte O(1) (degré fixé)
+# et le résultat est celui d'un ajustement unique sur toutes les données. Coefficients par puissance croissante. ---
+class OnlinePolynomialFit:
+    def __init__(self, degree, n=0, xtx=None, xty=None, yty=0.0):
+        size = degree + 1
+        self.degree = degree
+        self.n = n
+        self.xtx = np.zeros((size, size)) if xtx is None else np.asarray(xtx, dtype=np.float64)
+        self.xty = np.zeros(size) if xty is None else np.asarray(xty, dtype=np.float64)
+        self.yty = float(yty)
+        self._coefficients = None
+
+    def _features(self, t):
+        return np.vander(np.atleast_1d(np.asarray(t, dtype=np.float64)), self.degree + 1, increasing=True)
+
+    def update(self, t, y):
+        features = self._features(t)
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        self.xtx += features.T @ features
+        self.xty += features.T @ y
+        self.yty += float(y @ y)
+        self.n += len(y)
+        self._coefficients = None
+        return self
+
+    @property
+    def coefficients(self):
+        if self._coefficients is None:
+            # lstsq plutôt que solve : reste défini tant qu'il y a moins d'observations que de coefficients
+            self._coefficients = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+        return self._coefficients
+
+    def predict(self, t):
+        return np.polynomial.polynomial.polyval(np.asarray(t, dtype=np.float64), self.coefficients)
+
+    # Variance résiduelle : somme des carrés des résidus (y'y - b'X'y) sur les degrés de liberté
+    def residual_variance(self):
+        residuals = self.yty - float(self.coefficients @ self.xty)
+        return max(residuals, 0.0) / max(self.n - self.degree - 1, 1)
+
+    # Intervalle de prédiction d'une nouvelle observation au niveau `level` (quantile de la loi normale, les
+    # séries ajustées comptant des centaines de points) : (bornes basses, bornes hautes)
+    def interval(self, t, level=0.95):
+        features = self._features(t)
+        variance = self.residual_variance()
+        leverage = np.einsum('ij,jk,ik->i', features, np.linalg.pinv(self.xtx), features)
+        spread = NormalDist().inv_cdf(0.5 + level / 2) * np.sqrt(variance * (1 + leverage))
+        prediction = features @ self.coefficients
+        return prediction - spread, prediction + spread
+
+    def state(self):
+        return {'degree': self.degree, 'n': self.n, 'xtx': self.xtx.tolist(), 'xty': self.xty.tolist(),
+                'yty': self.yty, 'coefficients': self.coefficients.tolist()}
+
+
+# --- Modèle scikit-learn (DASH_FIT_MODEL) : les trois estimateurs sont linéaires en les variables polynomiales,
+# seuls leurs coefficients sont conservés (JSON, jamais de pickle relu depuis le cache). Prédictions seulement,
+# sans intervalle ---
+class LinearModelFit:
+    def __init__(self, degree, coefficients):
+        self.degree = degree
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+
+    def predict(self, t):
+        return np.polynomial.polynomial.polyval(np.asarray(t, dtype=np.float64), self.coefficients)
+
+    def interval(self, t, level=0.95):
+        return None
+
+
+def fit_polynomial(t, y, degree):
+    return OnlinePolynomialFit(degree).update(t, y)
+
+
+def _fit_sklearn(t, y, degree, model):
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import PolynomialFeatures
+
+    pipeline = make_pipeline(PolynomialFeatures(degree), _sklearn_estimator(model))
+    pipeline.fit(np.asarray(t, dtype=np.float64).reshape(-1, 1), np.asarray(y, dtype=np.float64))
+    # Variables 1, t, t², ... : l'ordonnée à l'origine s'ajoute au coefficient constant
+    estimator = pipeline[-1]
+    coefficients = np.array(estimator.coef_, dtype=np.float64).ravel()
+    coefficients[0] += float(estimator.intercept_)
+    return LinearModelFit(degree, coefficients)
+
+
+def training_digest(t, y, degree, model):
+    digest = hashlib.sha256(f"{model}|{degree}".encode())
+    digest.update(np.ascontiguousarray(t, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+# Empreinte des seules bornes de la série : longueur, première observation et CHECK_POINTS dernières. Coût constant
+# quelle que soit la longueur de l'historique ; une série relue après ajout de lignes en fin de fichier, ou révisée
+# sur ses dernières observations (révisions FRED), est reconnue. Une correction au milieu de l'historique ne l'est
+# pas : supprimer FIT_DIR force alors le recalcul.
+def series_checksum(t, y, degree, model):
+    edges = np.r_[0:min(len(t), 1), max(len(t) - CHECK_POINTS, 0):len(t)]
+    return training_digest(np.r_[len(t), t[edges]], y[edges], degree, model)
+
+
+def _write(path, data):
+    os.makedirs(FIT_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=FIT_DIR)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+# Ajustement nommé, conservé dans FIT_DIR/<name>.json (ou <name>.<model>.json pour un modèle scikit-learn) :
+# - données, degré et modèle inchangés : relu tel quel ;
+# - données précédentes complétées par de nouvelles observations en fin de série (modèle numpy) : seules les
+#   nouvelles observations sont ajoutées à l'ajustement enregistré, les données déjà couvertes étant reconnues
+#   par series_checksum sans relire tout l'historique ;
+# - sinon : recalculé sur toutes les données.
+def fitted(name, t, y, degree=2, model=None):
+    model = model or MODEL
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    path = os.path.join(FIT_DIR, f"{name}.json" if model == 'numpy' else f"{name}.{model}.json")
+    entry = _load(path)
+
+    if model != 'numpy':
+        digest = training_digest(t, y, degree, model)
+        if entry is not None and entry.get('sha256') == digest:
+            return LinearModelFit(degree, entry['coefficients'])
+        fit = _fit_sklearn(t, y, degree, model)
+        _write(path, {'sha256': digest, 'model': model, 'degree': degree,
+                      'coefficients': fit.coefficients.tolist()})
+        logger.info(f"Ajustement {name} ({model}, degré {degree}) recalculé")
+        return fit
+
+    fit = None
+    if entry is not None and entry.get('degree') == degree and entry.get('n', 0) <= len(t):
+        known = entry['n']
+        if entry.get('checksum') == series_checksum(t[:known], y[:known], degree, model):
+            fit = OnlinePolynomialFit(degree, known, entry['xtx'], entry['xty'], entry['yty'])
+            if known == len(t):
+                return fit
+            fit.update(t[known:], y[known:])
+            logger.info(f"Ajustement {name} : {len(t) - known} observation(s) ajoutée(s)")
+    if fit is None:
+        fit = fit_polynomial(t, y, degree)
+        logger.info(f"Ajustement {name} ({model}, degré {degree}) recalculé")
+    _write(path, {'checksum': series_checksum(t, y, degree, model), 'model': model, **fit.state()})
+    return fit
@@ -0,0 +1,141 @@
+# Population autour d'un point, d'après une grille de population maillée posée dans data/population.asc
+# (format ESRI ASCII Grid, celui des grilles GPWv4 de SEDAC : cellules en nombre d'habitants).
+# Les cellules peuplées sont indexées dans un BallTree (distance haversine) : le rayon du cercle qui contient
+# une part donnée de la population mondiale autour d'un centre est obtenu par recherche dichotomique dans
+# la population cumulée des cellules triées par distance. Sans grille, la page 5 garde son rayon de 4100 km.
+# Importé par la page 5 et par le callback de la carte (population_map.py), pas au démarrage de l'application.
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import geodesic
+from cache import CACHE_DIR, ROOT_DIR
+
+logger = logging.getLogger(__name__)
+
+POPULATION_PATH = 'data/population.asc'
+# Cellules peuplées extraites de la grille, conservées au format NumPy (la lecture du texte est lente)
+GRID_CACHE_DIR = os.path.join(CACHE_DIR, 'population')
+# Rayon retenu sans grille de population (estimation publiée pour 50 % de la population autour de Guiyang)
+DEFAULT_RADIUS_KM = 4100
+SHARE = 0.5
+# Premier rayon interrogé dans l'index, doublé tant que la part demandée n'est pas atteinte
+INITIAL_RADIUS_KM = 1000
+
+
+def circle_label(radius_km, share=SHARE):
+    return f"Rayon de {radius_km:.0f} km ({share:.0%} population)"
+
+
+# --- Lecture d'une grille ESRI ASCII : en-tête (ncols, nrows, xllcorner, yllcorner, cellsize, NODATA_value)
+# puis une ligne de valeurs par rangée, du nord au sud ---
+def read_grid(path):
+    header = {}
+    with open(path) as f:
+        for line in f:
+            key, _, value = line.strip().partition(' ')
+            if not key or not key[0].isalpha():
+                break
+            header[key.lower()] = float(value)
+    size = header['cellsize']
+    ncols, nrows = int(header['ncols']), int(header['nrows'])
+    # Coin inférieur gauche ou centre de la cellule inférieure gauche
+    west = header['xllcorner'] + size / 2 if 'xllcorner' in header else header['xllcenter']
+    south = header['yllcorner'] + size / 2 if 'yllcorner' in header else header['yllcenter']
+
+    values = pd.read_csv(path, sep=r'\s+', header=None, skiprows=len(header), usecols=range(ncols),
+                         dtype=np.float64).to_numpy()[:nrows]
+    if 'nodata_value' in header:
+        values[values == header['nodata_value']] = np.nan
+    rows, columns = np.nonzero(values > 0)
+    lats = south + (nrows - 1 - rows) * size
+    lons = west + columns * size
+    return lats, lons, values[rows, columns]
+
+
+def _cached_cells(full_path):
+    stat = os.stat(full_path)
+    cache_path = os.path.join(GRID_CACHE_DIR, f"{os.path.basename(full_path)}-{stat.st_mtime_ns}-{stat.st_size}.npz")
+    try:
+        with np.load(cache_path) as cells:
+            return cells['lats'], cells['lons'], cells['population']
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    lats, lons, population = read_grid(full_path)
+    os.makedirs(GRID_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, lats=lats, lons=lons, population=population)
+    os.replace(tmp_path, cache_path)
+    return lats, lons, population
+
+
+class PopulationGrid:
+    def __init__(self, lats, lons, population):
+        # scikit-learn n'est importé que si une grille de population est posée
+        from sklearn.neighbors import BallTree
+
+        self.population = np.asarray(population, dtype=np.float64)
+        self.total = self.population.sum()
+        self.tree = BallTree(np.radians(np.column_stack([lats, lons])), metric='haversine')
+
+    def __len__(self):
+        return len(self.population)
+
+    # Population à moins de radius_km de (lat, lon)
+    def within(self, lat, lon, radius_km):
+        indices = self.tree.query_radius(np.radians([[lat, lon]]), r=radius_km / geodesic.EARTH_RADIUS_KM)[0]
+        return self.population[indices].sum()
+
+    # Rayon (km) du plus petit cercle centré en (lat, lon) qui contient la part `share` de la population totale
+    def radius_for_share(self, lat, lon, share=SHARE):
+        target = min(max(share, 0.0), 1.0) * self.total
+        point = np.radians([[lat, lon]])
+        previous, radius = 0.0, INITIAL_RADIUS_KM / geodesic.EARTH_RADIUS_KM
+        while True:
+            indices, distances = self.tree.query_radius(point, r=radius, return_distance=True)
+            distances, population = distances[0], self.population[indices[0]]
+            if population.sum() >= target or radius >= np.pi:
+                break
+            previous, radius = radius, min(radius * 2, np.pi)
+        # Seule la couronne entre les deux derniers rayons est triée par distance : recherche dichotomique
+        # dans la population cumulée, à partir de la population du disque précédent
+        ring = distances > previous
+        order = np.argsort(distances[ring], kind='stable')
+        cumulative = population[~ring].sum() + np.cumsum(population[ring][order])
+        if not len(cumulative):
+            return 0.0
+        position = min(np.searchsorted(cumulative, target), len(cumulative) - 1)
+        return distances[ring][order][position] * geodesic.EARTH_RADIUS_KM
+
+
+_grid = None
+_grid_signature = None
+_lock = threading.Lock()
+
+
+# Grille de population indexée, construite une fois par processus (None si data/population.asc est absent)
+def load_grid(path=POPULATION_PATH):
+    global _grid, _grid_signature
+    full_path = os.path.join(ROOT_DIR, path)
+    try:
+        stat = os.stat(full_path)
+    except FileNotFoundError:
+        return None
+    signature = (full_path, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if signature != _grid_signature:
+            start = time.perf_counter()
+            _grid = PopulationGrid(*_cached_cells(full_path))
+            _grid_signature = signature
+            logger.info(f"Population : {len(_grid)} cellules indexées en {(time.perf_counter() - start) * 1000:.0f} ms")
+        return _grid
+
+
+# Rayon couvrant la part `share` de la population mondiale autour de (lat, lon), DEFAULT_RADIUS_KM sans grille
+def radius_for_share(lat, lon, share=SHARE):
+    grid = load_grid()
+    return DEFAULT_RADIUS_KM if grid is None else grid.radius_for_share(lat, lon, share)
@@ -0,0 +1,90 @@
+# Carte interactive de la page 5 : un clic sur la carte recentre le cercle de population.
+# Module importé par app.py pour ses callbacks : le calcul du rayon (population.py : NumPy, scikit-learn) n'est
+# importé qu'au premier clic.
+from dash import Input, Output, Patch, State, callback, clientside_callback
+from dash.exceptions import PreventUpdate
+
+MAP_ID = 'population-map'
+CENTER_ID = 'population-center'
+# Traces du centre et du cercle, repérées par leur uid ; leurs positions dans la figure sont conservées par la page
+# dans le Store TRACES_ID (aucune position supposée : une trace ajoutée à la carte ne décale rien)
+CENTER_TRACE_UID = 'population-center-trace'
+CIRCLE_TRACE_UID = 'population-circle-trace'
+TRACES_ID = 'population-traces'
+
+
+# Positions des traces du centre et du cercle dans une figure, par uid
+def trace_indices(figure):
+    uids = (CENTER_TRACE_UID, CIRCLE_TRACE_UID)
+    return {trace.uid: index for index, trace in enumerate(figure.data) if trace.uid in uids}
+
+
+# Centre [lat, lon] choisi par un clic n'importe où sur la carte (pays, océan, traces) : plotly ne signale les clics
+# que sur ses points (et seulement le centroïde d'un pays de la choroplèthe), la position du clic est donc
+# convertie en coordonnées par la projection de la carte. Un écouteur unique sur le document est installé au
+# premier affichage ; un glissement (déplacement de la carte) n'est pas un clic.
+CLICK_HANDLER = """
+    function(mapId, centerId) {
+        if (window.populationMapClick) {
+            return dash_clientside.no_update;
+        }
+        window.populationMapClick = true;
+        let down = null;
+        document.addEventListener('mousedown', function(event) {
+            down = [event.clientX, event.clientY];
+        }, true);
+        document.addEventListener('click', function(event) {
+            const target = event.target;
+            const graph = target.closest && target.closest('#' + mapId + ' .js-plotly-plot');
+            const geo = graph && graph._fullLayout && graph._fullLayout.geo && graph._fullLayout.geo._subplot;
+            if (!geo || !target.closest('.geolayer') || !down
+                    || Math.abs(event.clientX - down[0]) + Math.abs(event.clientY - down[1]) > 3) {
+                return;
+            }
+            const paper = graph.querySelector('.main-svg').getBoundingClientRect();
+            const lonlat = geo.projection.invert([event.clientX - paper.left, event.clientY - paper.top]);
+            if (lonlat && isFinite(lonlat[0]) && isFinite(lonlat[1])) {
+                dash_clientside.set_props(centerId, {data: [lonlat[1], lonlat[0]]});
+            }
+        }, true);
+        return dash_clientside.no_update;
+    }
+    """
+
+clientside_callback(
+    CLICK_HANDLER,
+    Output(CENTER_ID, 'data'),
+    Input(MAP_ID, 'id'),
+    State(CENTER_ID, 'id')
+)
+
+
+# Cercle recalculé autour du centre choisi : seules les traces du centre et du cercle sont renvoyées (Patch)
+@callback(
+    Output(MAP_ID, 'figure'),
+    Input(CENTER_ID, 'data'),
+    State(TRACES_ID, 'data'),
+    prevent_initial_call=True
+)
+def update_population_circle(center, traces):
+    # Import au premier clic seulement (déjà fait si ce worker a construit la page 5)
+    import geodesic
+    import population
+
+    grid = population.load_grid()
+    traces = traces or {}
+    if grid is None or not center or CENTER_TRACE_UID not in traces or CIRCLE_TRACE_UID not in traces:
+        # Sans grille, le rayon ne peut pas être recalculé : le cercle de référence reste affiché
+        raise PreventUpdate
+    lat, lon = center
+    radius = grid.radius_for_share(lat, lon)
+    circle_lats, circle_lons = geodesic.circle(lat, lon, radius)
+    center_trace, circle_trace = traces[CENTER_TRACE_UID], traces[CIRCLE_TRACE_UID]
+    patch = Patch()
+    patch['data'][center_trace]['lat'] = [lat]
+    patch['data'][center_trace]['lon'] = [lon]
+    patch['data'][center_trace]['name'] = f"Centre ({lat:.1f}, {lon:.1f})"
+    patch['data'][circle_trace]['lat'] = circle_lats
+    patch['data'][circle_trace]['lon'] = circle_lons
+    patch['data'][circle_trace]['name'] = population.circle_label(radius)
+    return patch
@@ -0,0 +1,267 @@
+# Profilage de la construction des pages : chaque module de page est exécuté dans un processus neuf sous cProfile
+# (temps) puis sous tracemalloc (allocations), et le coût est réparti par étape (lecture des CSV, fusions,
+# normalisation, figures Plotly Express, Page.render...).
+# Lancement depuis la racine du dépôt : python -m profile_pages [page ...] [--output-dir profiles]
+# Les fichiers <page>.folded produits sont au format "piles repliées" (flamegraph.pl, speedscope, inferno).
+import argparse
+import cProfile
+import importlib.util
+import json
+import os
+import pstats
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Bibliothèques importées avant la mesure : leur coût d'import est mesuré à part
+LIBRARIES = ('numpy', 'pandas', 'plotly.express', 'plotly.graph_objects', 'dash')
+
+# Étapes reconnues dans une pile d'appels, de la racine vers la feuille : la première qui correspond l'emporte.
+# Une étape correspond à un fichier (suffixe du chemin) et éventuellement à un ensemble de fonctions.
+STAGES = [
+    ('imports', None, {'_find_and_load'}),
+    ('lecture CSV', 'loader.py', {'read_csv'}),
+    ('lecture CSV', 'timeseries.py', {'load_series', 'open_series', 'to_frame'}),
+    ('lecture CSV', os.path.join('pandas', 'io', 'parsers', 'readers.py'), {'read_csv'}),
+    ('fusion', os.path.join('pandas', 'core', 'reshape', 'merge.py'), None),
+    ('fusion', os.path.join('pandas', 'core', 'reshape', 'concat.py'), None),
+    ('fusion', os.path.join('pandas', 'core', 'frame.py'), {'merge', 'join'}),
+    ('normalisation', 'regimes.py', {'_normalize', '_normalize_ratio', '_normalize_inflation', '_ratio', '_monthly'}),
+    ('figures (px)', os.path.join('plotly', 'express', ''), None),
+    ('Page.render', 'template.py', {'render'}),
+    ('figures (plotly)', os.path.join('plotly', ''), None),
+]
+# Si aucune étape ne correspond : calculs pandas/numpy appelés directement par le code des pages, ou reste
+GENERIC_STAGES = [
+    ('calculs pandas', os.path.join('pandas', '')),
+    ('calculs numpy', os.path.join('numpy', '')),
+]
+OTHER_STAGE = 'autre'
+STAGE_ORDER = [name for name, _, _ in STAGES] + [name for name, _ in GENERIC_STAGES] + [OTHER_STAGE]
+STAGE_ORDER = list(dict.fromkeys(STAGE_ORDER))
+
+# Période d'échantillonnage des piles (secondes)
+SAMPLE_INTERVAL = 0.001
+
+
+def stage_of(frames):
+    for filename, _, function in frames:
+        for name, suffix, functions in STAGES:
+            if suffix is not None and suffix not in filename:
+                continue
+            if functions is None or function in functions:
+                return name
+    for filename, _, _ in reversed(frames):
+        for name, suffix in GENERIC_STAGES:
+            if suffix in filename:
+                return name
+    return OTHER_STAGE
+
+
+def _frame_label(frame):
+    filename, line, function = frame
+    return f"{os.path.basename(filename)}:{function}:{line}".replace(';', ',').replace(' ', '_')
+
+
+# --- Échantillonnage des piles du thread principal : contrairement à cProfile, qui ralentit surtout le code
+# Python (validateurs Plotly) et fausserait la comparaison avec pandas, le coût reste proportionnel au temps réel.
+# Chaque échantillon est pondéré par le temps écoulé depuis le précédent et, si tracemalloc est actif,
+# par la variation de la mémoire allouée (allocations nettes de la pile). ---
+class StackSampler:
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = {}
+        self.allocations = {}
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def __enter__(self):
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(self.interval / 2)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        previous = time.perf_counter()
+        previous_memory = tracemalloc.get_traced_memory()[0]
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            now = time.perf_counter()
+            memory = tracemalloc.get_traced_memory()[0]
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                if code is _build_page.__code__:
+                    break
+                frame = frame.f_back
+            else:
+                stack = None  # Hors de la construction de la page
+            if stack:
+                key = tuple(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + now - previous
+                self.allocations[key] = self.allocations.get(key, 0) + memory - previous_memory
+            previous = now
+            # Les allocations de l'échantillonneur lui-même (piles, dictionnaires) ne sont pas comptées
+            previous_memory = tracemalloc.get_traced_memory()[0]
+
+
+# Exécute le module de page comme un import (la racine des piles profilées)
+def _build_page(page):
+    spec = importlib.util.spec_from_file_location(page, os.path.join(ROOT_DIR, f"{page}.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[page] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# --- Exécution dans le processus enfant ---
+def profile_time(page, output_dir):
+    start = time.perf_counter()
+    for library in LIBRARIES:
+        importlib.import_module(library)
+    import_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with StackSampler() as sampler:
+        _build_page(page)
+    total_ms = (time.perf_counter() - start) * 1000
+
+    stages = dict.fromkeys(STAGE_ORDER, 0.0)
+    lines = []
+    for path, seconds in sampler.stacks.items():
+        stages[stage_of(path)] += seconds * 1000
+        lines.append(f"{';'.join(_frame_label(frame) for frame in path)} {round(seconds * 1e6)}")
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, f"{page}.folded"), 'w') as f:
+        f.write('\n'.join(sorted(lines)) + '\n')
+    return {'import_ms': import_ms, 'total_ms': total_ms, 'stages_ms': stages}
+
+
+# Fonctions les plus coûteuses selon cProfile (passe séparée : le profileur déterministe gonfle le code Python)
+def profile_functions(page):
+    for library in LIBRARIES:
+        importlib.import_module(library)
+    profiler = cProfile.Profile()
+    profiler.runcall(_build_page, page)
+    stats = pstats.Stats(profiler).stats
+    top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    top_functions = [{'function': _frame_label(function), 'calls': nc, 'own_ms': tt * 1000, 'cumulative_ms': ct * 1000}
+                     for function, (_, nc, tt, ct, _) in top if function[0] != '~'][:20]
+    return {'top_functions': top_functions}
+
+
+# Passe séparée sous tracemalloc (une seule trame par allocation : les piles viennent de l'échantillonneur)
+def profile_memory(page):
+    for library in LIBRARIES:
+        importlib.import_module(library)
+    tracemalloc.start()
+    with StackSampler() as sampler:
+        _build_page(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, __file__),
+                                                          tracemalloc.Filter(False, tracemalloc.__file__)])
+    tracemalloc.stop()
+
+    stages = dict.fromkeys(STAGE_ORDER, 0)
+    for path, size in sampler.allocations.items():
+        stages[stage_of(path)] += size
+    # Mémoire encore allouée en fin de construction (DataFrames, figures, layout), par ligne
+    top_lines = [{'line': str(stat.traceback[0]), 'kb': stat.size / 1024, 'blocks': stat.count}
+                 for stat in snapshot.statistics('lineno')[:15]]
+    return {'peak_kb': peak / 1024, 'stages_kb': {name: size / 1024 for name, size in stages.items()},
+            'top_lines': top_lines}
+
+
+# --- Rapport ---
+def run_child(page, mode, output_dir):
+    output = subprocess.run([sys.executable, '-m', 'profile_pages', '--child', mode, '--output-dir', output_dir, page],
+                            cwd=ROOT_DIR, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_report(results):
+    for page, result in results.items():
+        timing, memory = result['time'], result['memory']
+        print(f"\n=== {page} : {timing['total_ms']:.0f} ms (imports des bibliothèques : {timing['import_ms']:.0f} ms), "
+              f"pic mémoire {memory['peak_kb'] / 1024:.1f} Mo ===")
+        print(f"{'étape':<20} {'temps (ms)':>10} {'%':>6} {'mémoire (Ko)':>13}")
+        for stage in sorted(STAGE_ORDER, key=lambda name: timing['stages_ms'][name], reverse=True):
+            ms = timing['stages_ms'][stage]
+            kb = memory['stages_kb'][stage]
+            if ms < 0.5 and kb < 1:
+                continue
+            share = ms / timing['total_ms'] * 100 if timing['total_ms'] else 0
+            print(f"{stage:<20} {ms:>10.1f} {share:>5.1f}% {kb:>13.0f}")
+        print("Fonctions les plus coûteuses (temps cumulé) :")
+        for entry in result['functions']['top_functions'][:10]:
+            print(f"  {entry['cumulative_ms']:>8.1f} ms  {entry['calls']:>7}  {entry['function']}")
+        print("Lignes retenant le plus de mémoire :")
+        for entry in memory['top_lines'][:5]:
+            print(f"  {entry['kb']:>8.0f} Ko  {entry['line']}")
+
+    totals = dict.fromkeys(STAGE_ORDER, 0.0)
+    for result in results.values():
+        for stage, ms in result['time']['stages_ms'].items():
+            totals[stage] += ms
+    grand_total = sum(totals.values()) or 1
+    print("\n=== Toutes pages (démarrage à froid d'un worker) ===")
+    for stage, ms in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+        if ms >= 0.5:
+            print(f"{stage:<20} {ms:>10.1f} {ms / grand_total * 100:>5.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profilage de la construction des pages par étape")
+    parser.add_argument('pages', nargs='*', help="pages à profiler (par défaut toutes celles de app.page_names)")
+    parser.add_argument('--output-dir', default='profiles',
+                        help="répertoire des piles repliées <page>.folded et du rapport JSON")
+    parser.add_argument('--child', choices=('time', 'functions', 'memory'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    output_dir = os.path.abspath(args.output_dir)
+
+    if args.child:
+        page = args.pages[0]
+        if args.child == 'time':
+            result = profile_time(page, output_dir)
+        elif args.child == 'functions':
+            result = profile_functions(page)
+        else:
+            result = profile_memory(page)
+        print(json.dumps(result))
+        return
+
+    pages = args.pages
+    if not pages:
+        # Liste lue sans importer app (et donc sans dash ni les callbacks)
+        pages = list(_page_names())
+    results = {page: {mode: run_child(page, mode, output_dir) for mode in ('time', 'functions', 'memory')}
+               for page in pages}
+    print_report(results)
+    with open(os.path.join(output_dir, 'report.json'), 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nPiles repliées et rapport JSON écrits dans {output_dir}")
+
+
+def _page_names():
+    import ast
+    with open(os.path.join(ROOT_DIR, 'app.py'), 'rb') as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'page_names' for t in node.targets):
+            return ast.literal_eval(node.value).keys()
+    return []
+
+
+if __name__ == '__main__':
+    main()
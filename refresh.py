@@ -0,0 +1,99 @@
+import datetime
+import logging
+import os
+import threading
+import time
+
+import metrics
+from cache import ROOT_DIR
+
+logger = logging.getLogger(__name__)
+
+# Intervalle de scrutation de data/ en secondes (0 : pas de rafraîchissement)
+REFRESH_INTERVAL = float(os.environ.get('DASH_REFRESH_INTERVAL', '60'))
+
+REFRESHES = metrics.counter('dash_page_refresh_total', "Reconstructions de pages après un changement de données ou de date")
+
+
+# Rafraîchissement des pages en arrière-plan : les fichiers de données déclarés par chaque page ("data")
+# sont scrutés (date de modification et taille), seules les pages concernées sont reconstruites, ainsi que
+# les pages marquées "daily" au changement de jour. Le nouveau layout remplace l'ancien d'un bloc
+# (PageRegistry.rebuild) : aucune requête ne voit une page à moitié construite.
+class Refresher:
+    def __init__(self, pages, interval=REFRESH_INTERVAL):
+        self.pages = pages
+        self.interval = interval
+        self._signatures = self._scan()
+        self._day = datetime.date.today()
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _watched(self):
+        watched = {}
+        for page, page_data in self.pages.page_names.items():
+            for path in page_data.get('data', []):
+                watched.setdefault(path, []).append(page)
+        return watched
+
+    def _scan(self):
+        signatures = {}
+        for path in self._watched():
+            try:
+                stat = os.stat(os.path.join(ROOT_DIR, path))
+                signatures[path] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                signatures[path] = None
+        return signatures
+
+    # Pages dont un fichier a changé (ou est apparu) depuis le dernier passage, et pages quotidiennes
+    # si la date a changé
+    def changed_pages(self):
+        signatures = self._scan()
+        watched = self._watched()
+        changed = set()
+        for path, signature in signatures.items():
+            if signature != self._signatures.get(path):
+                logger.info(f"Rafraîchissement : {path} modifié")
+                changed.update(watched[path])
+        self._signatures = signatures
+
+        today = datetime.date.today()
+        if today != self._day:
+            self._day = today
+            changed.update(page for page, page_data in self.pages.page_names.items() if page_data.get('daily'))
+        return changed
+
+    def refresh_once(self):
+        for page in sorted(self.changed_pages()):
+            # Une page jamais construite dans ce worker le sera à sa première visite, avec les données à jour
+            if not self.pages.is_built(page):
+                continue
+            start = time.perf_counter()
+            try:
+                self.pages.rebuild(page)
+            except Exception:
+                REFRESHES.inc(page=page, result='error')
+                logger.exception(f"Rafraîchissement de {page} impossible, l'ancien layout est conservé")
+                continue
+            REFRESHES.inc(page=page, result='ok')
+            logger.info(f"Page {page} rafraîchie en {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh_once()
+            except Exception:
+                logger.exception("Erreur pendant le rafraîchissement des pages")
+
+    # Un thread par processus : appelé à chaque requête, il ne démarre qu'une fois par worker
+    # (les threads du maître gunicorn ne survivent pas au fork en mode préchargement)
+    def start(self):
+        if self.interval <= 0 or self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name="page-refresh", daemon=True).start()
+            self._pid = os.getpid()
+            logger.info(f"Rafraîchissement des pages toutes les {self.interval:.0f} s (worker {self._pid})")
@@ -0,0 +1,255 @@
+import numpy as np
+import pandas as pd
+
+# Quadrants économiques (ratio pétrole/M2 normalisé en x, inflation implicite normalisée en y)
+QUADRANTS = {
+    'Inflationary Bust': 'rgb(255,69,0)',
+    'Inflationary Boom': 'rgb(255,105,180)',
+    'Disinflationary Bust': 'rgb(65,105,225)',
+    'Disinflationary Boom': 'rgb(50,205,50)',
+}
+ON_AXIS = ('On Axis', 'gray')
+
+# Croissance annuelle appliquée à M2 pour le ratio pétrole / M2 ajusté (année de référence 2003)
+M2_GROWTH = -0.024
+M2_REFERENCE_YEAR = 2003
+
+_LABELS = np.array(list(QUADRANTS) + [ON_AXIS[0]], dtype=object)
+_COLORS = np.array(list(QUADRANTS.values()) + [ON_AXIS[1]], dtype=object)
+
+
+# --- Indice du quadrant de chaque point (4 = sur un axe ou valeur manquante) ---
+def _quadrant_codes(x, y):
+    return np.select(
+        [(x <= 0) & (y >= 0), (x > 0) & (y >= 0), (x <= 0) & (y < 0), (x > 0) & (y < 0)],
+        [0, 1, 2, 3],
+        default=4,
+    )
+
+
+# --- Classification vectorisée : quadrant et quadrant le plus proche pour des tableaux x/y normalisés ---
+# Le quadrant le plus proche est obtenu en inversant la coordonnée la plus faible en valeur absolue
+# (x si |x| <= |y|, y sinon) ; un point sur un axe n'a pas de quadrant voisin.
+def classify_quadrants(x, y):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    quad = _quadrant_codes(x, y)
+
+    flip_x = np.abs(x) <= np.abs(y)
+    closest = _quadrant_codes(np.where(flip_x, -x, x), np.where(flip_x, y, -y))
+    closest[(x == 0) | (y == 0)] = 4
+
+    return _LABELS[quad], _COLORS[quad], _LABELS[closest], _COLORS[closest]
+
+
+# --- Segmentation en régimes : points consécutifs ayant le même quadrant et le même quadrant proche ---
+# Les ruptures sont détectées par comparaison décalée des étiquettes, puis toutes les statistiques
+# des segments (dates extrêmes, distance moyenne, étiquettes) sont agrégées en une passe (reduceat).
+# Attend les colonnes observation_date, quad_label, quad_color, closest_label, closest_color, distance.
+def segment_regimes(df):
+    columns = ['start_date', 'hover_label', 'avg_dist', 'quad_label', 'quad_color', 'closest_label', 'closest_color']
+    if df.empty:
+        # Mêmes types de colonnes qu'avec des régimes (les ajouts incrémentaux y sont concaténés)
+        dtypes = {'start_date': 'datetime64[ns]', 'avg_dist': float}
+        return pd.DataFrame({column: pd.Series(dtype=dtypes.get(column, object)) for column in columns})
+
+    quad = pd.factorize(df['quad_label'])[0]
+    closest = pd.factorize(df['closest_label'])[0]
+    change = np.empty(len(df), dtype=bool)
+    change[0] = True
+    np.not_equal(quad[1:], quad[:-1], out=change[1:])
+    change[1:] |= closest[1:] != closest[:-1]
+    starts = np.flatnonzero(change)
+
+    ticks = df['observation_date'].to_numpy(dtype='datetime64[ns]').view('i8')
+    first = np.minimum.reduceat(ticks, starts).view('datetime64[ns]')
+    last = np.maximum.reduceat(ticks, starts).view('datetime64[ns]')
+
+    # Moyenne par segment en ignorant les valeurs manquantes
+    distance = df['distance'].to_numpy(dtype=float)
+    valid = ~np.isnan(distance)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    sums = np.add.reduceat(np.where(valid, distance, 0.0), starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_dist = sums / counts
+
+    # Libellés "AAAA-MM à AAAA-MM" formatés une seule fois par couple de mois distinct
+    month_min = first.astype('datetime64[M]').astype(np.int64)
+    month_max = last.astype('datetime64[M]').astype(np.int64)
+    keys, inverse = np.unique((month_min << 32) + (month_max - month_min), return_inverse=True)
+    dmin = (keys >> 32).astype('datetime64[M]').astype(str).astype(object)
+    dmax = ((keys >> 32) + (keys & 0xFFFFFFFF)).astype('datetime64[M]').astype(str).astype(object)
+    hover_label = np.where(dmin == dmax, dmin, dmin + ' à ' + dmax)[inverse]
+
+    return pd.DataFrame({
+        'start_date': first,
+        'hover_label': hover_label,
+        'avg_dist': avg_dist,
+        'quad_label': df['quad_label'].to_numpy()[starts],
+        'quad_color': df['quad_color'].to_numpy()[starts],
+        'closest_label': df['closest_label'].to_numpy()[starts],
+        'closest_color': df['closest_color'].to_numpy()[starts],
+    }, columns=columns)
+
+
+# Calcul des régimes à partir des séries FRED (T10YIE quotidien, M2SL et WTISPLC mensuels), mis à jour
+# au fil de l'arrivée de nouvelles observations : la normalisation n'est refaite entièrement que si un
+# nouveau minimum ou maximum global apparaît, sinon seule la fin des séries est reclassée et le dernier
+# régime prolongé ou découpé. Le résultat est identique à un recalcul complet (rebuild).
+class RegimeTracker:
+    def __init__(self, start_date, end_date=None):
+        self.start_date = pd.Timestamp(start_date)
+        self.end_date = pd.Timestamp(end_date) if end_date is not None else None
+        self.series = {name: pd.DataFrame({'observation_date': pd.Series(dtype='datetime64[ns]'),
+                                           name: pd.Series(dtype=float)})
+                       for name in ('T10YIE', 'M2SL', 'WTISPLC')}
+        self.combined = None
+        self.inflation_monthly = None
+        self.normalized = None
+        self.clustered = None
+        self.ratio_range = None
+        self.inflation_range = None
+
+    # --- Ajout de nouvelles observations (les dates déjà connues sont ignorées) ---
+    def append(self, t10yie=None, m2sl=None, wtisplc=None):
+        new_rows = {}
+        for name, df in (('T10YIE', t10yie), ('M2SL', m2sl), ('WTISPLC', wtisplc)):
+            if df is None:
+                continue
+            rows = self._new_rows(name, df)
+            if not rows.empty:
+                new_rows[name] = rows
+                self.series[name] = pd.concat([self.series[name], rows], ignore_index=True)
+
+        if self.normalized is None:
+            self.rebuild()
+            return
+        if not new_rows:
+            return
+
+        cutoffs = []
+        if 'WTISPLC' in new_rows or 'M2SL' in new_rows:
+            # Les nouvelles lignes du ratio sont toutes postérieures à la dernière date déjà fusionnée
+            last = self.combined['observation_date'].max()
+            tail = self._ratio(pd.merge(self._after(self.series['WTISPLC'], last),
+                                        self._after(self.series['M2SL'], last), on='observation_date'))
+            if not tail.empty:
+                cutoffs.append(tail['observation_date'].min())
+                self.combined = pd.concat([self.combined, tail], ignore_index=True)
+        if 'T10YIE' in new_rows:
+            # Le mois en cours peut déjà exister (mois partiel) : sa moyenne est recalculée
+            first_month = new_rows['T10YIE']['observation_date'].min().to_period('M').to_timestamp()
+            daily = self.series['T10YIE']
+            tail = self._monthly(daily[daily['observation_date'] >= first_month])
+            kept = self.inflation_monthly[self.inflation_monthly['observation_date'] < first_month]
+            cutoffs.append(first_month)
+            self.inflation_monthly = pd.concat([kept, tail], ignore_index=True)
+        if not cutoffs:
+            return
+
+        cutoff = min(cutoffs)
+        ratio_range = self._range(self.combined['ratio'])
+        inflation_range = self._range(self.inflation_monthly['T10YIE'])
+        if ratio_range != self.ratio_range or inflation_range != self.inflation_range:
+            self.ratio_range, self.inflation_range = ratio_range, inflation_range
+            self._normalize(self.combined, self.inflation_monthly)
+            self._classify_from(0)
+            return
+
+        combined_tail = self.combined['observation_date'] >= cutoff
+        monthly_tail = self.inflation_monthly['observation_date'] >= cutoff
+        self.combined.loc[combined_tail, 'ratio_normalized'] = self._normalize_ratio(
+            self.combined.loc[combined_tail, 'ratio'])
+        self.inflation_monthly.loc[monthly_tail, 'T10YIE_normalized'] = self._normalize_inflation(
+            self.inflation_monthly.loc[monthly_tail, 'T10YIE'])
+        head = self.normalized[self.normalized['observation_date'] < cutoff]
+        tail = self._classify(self._merge(self.combined[combined_tail], self.inflation_monthly[monthly_tail]))
+        self.normalized = pd.concat([head, tail], ignore_index=True)
+        self._classify_from(len(head), classified=True)
+
+    # --- Recalcul complet à partir des séries stockées ---
+    def rebuild(self):
+        self.combined = self._ratio(pd.merge(self.series['WTISPLC'], self.series['M2SL'], on='observation_date'))
+        self.inflation_monthly = self._monthly(self.series['T10YIE'])
+        self.ratio_range = self._range(self.combined['ratio'])
+        self.inflation_range = self._range(self.inflation_monthly['T10YIE'])
+        self._normalize(self.combined, self.inflation_monthly)
+        self._classify_from(0)
+
+    def _new_rows(self, name, df):
+        df = df[['observation_date', name]].copy()
+        df['observation_date'] = pd.to_datetime(df['observation_date'])
+        keep = df['observation_date'] >= self.start_date
+        if self.end_date is not None:
+            keep &= df['observation_date'] <= self.end_date
+        known = self.series[name]['observation_date']
+        if not known.empty:
+            keep &= df['observation_date'] > known.max()
+        return df[keep].sort_values('observation_date')
+
+    @staticmethod
+    def _after(df, date):
+        return df if pd.isna(date) else df[df['observation_date'] > date]
+
+    @staticmethod
+    def _range(values):
+        return values.min(), values.max()
+
+    @staticmethod
+    def _ratio(df):
+        df['year'] = df['observation_date'].dt.year
+        df['growth_factor'] = (1 + M2_GROWTH) ** (df['year'] - M2_REFERENCE_YEAR)
+        df['M2_adjusted'] = df['M2SL'] * df['growth_factor']
+        df['ratio'] = df['WTISPLC'] / df['M2_adjusted']
+        return df
+
+    @staticmethod
+    def _monthly(df):
+        monthly = df.groupby(df['observation_date'].dt.to_period('M'))['T10YIE'].mean().reset_index()
+        monthly['observation_date'] = monthly['observation_date'].dt.to_timestamp()
+        return monthly
+
+    # Ratio inversé (1 au minimum, -1 au maximum), inflation dans [-1, 1]
+    def _normalize_ratio(self, ratio):
+        ratio_min, ratio_max = self.ratio_range
+        return 1 - 2 * (ratio - ratio_min) / (ratio_max - ratio_min)
+
+    def _normalize_inflation(self, inflation):
+        infl_min, infl_max = self.inflation_range
+        return 2 * (inflation - infl_min) / (infl_max - infl_min) - 1
+
+    def _normalize(self, combined, monthly):
+        combined['ratio_normalized'] = self._normalize_ratio(combined['ratio'])
+        monthly['T10YIE_normalized'] = self._normalize_inflation(monthly['T10YIE'])
+
+    @staticmethod
+    def _merge(combined, monthly):
+        return pd.merge(
+            combined[['observation_date', 'ratio_normalized']],
+            monthly[['observation_date', 'T10YIE_normalized']],
+            on='observation_date'
+        ).sort_values('observation_date', ignore_index=True)
+
+    @staticmethod
+    def _classify(df):
+        x = df['ratio_normalized'].to_numpy()
+        y = df['T10YIE_normalized'].to_numpy()
+        df['quad_label'], df['quad_color'], df['closest_label'], df['closest_color'] = classify_quadrants(x, y)
+        df['distance'] = np.sqrt(df['ratio_normalized'] ** 2 + df['T10YIE_normalized'] ** 2)
+        return df
+
+    # Reclasse à partir de la ligne row : les régimes qui se terminent avant sont conservés, celui qui
+    # contient la ligne précédente est recalculé car il peut être prolongé ou découpé par les nouveaux points
+    def _classify_from(self, row, classified=False):
+        if row == 0:
+            if not classified:
+                self.normalized = self._classify(self._merge(self.combined, self.inflation_monthly))
+            self.clustered = segment_regimes(self.normalized)
+            return
+        dates = self.normalized['observation_date'].to_numpy()
+        segment_rows = np.searchsorted(dates, self.clustered['start_date'].to_numpy())
+        kept = np.searchsorted(segment_rows, row - 1, side='right') - 1
+        self.clustered = pd.concat([self.clustered.iloc[:kept],
+                                    segment_regimes(self.normalized.iloc[segment_rows[kept]:])],
+                                   ignore_index=True)
@@ -0,0 +1,164 @@
+import datetime
+import gc
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from dash import html
+from plotly.io.json import to_json_plotly
+
+import metrics
+import zoom
+from cache import ROOT_DIR, page_key
+
+logger = logging.getLogger(__name__)
+
+
+# Registre des pages : chaque module n'est importé (et donc chaque layout construit)
+# qu'à la première demande, au lieu d'être préchargé au démarrage du worker
+class PageRegistry:
+    def __init__(self, page_names, cache=None):
+        self.page_names = page_names
+        self.cache = cache
+        self._layouts = {}
+        self._frozen = {}
+        self._locks = {page: threading.Lock() for page in page_names}
+
+    def __contains__(self, page):
+        return page in self.page_names
+
+    def keys(self):
+        return self.page_names.keys()
+
+    def is_built(self, page):
+        return page in self._layouts or page in self._frozen
+
+    def get(self, page, default=None):
+        if page not in self.page_names:
+            return default
+        frozen = self._frozen.get(page)
+        if frozen is not None:
+            return frozen
+        layout = self._layouts.get(page)
+        if layout is None:
+            # Un verrou par page : deux requêtes simultanées ne construisent pas deux fois la même page
+            with self._locks[page]:
+                layout = self._layouts.get(page)
+                if layout is None:
+                    layout = self._build(page)
+                    self._layouts[page] = layout
+        return layout
+
+    def _build(self, page, fresh=False):
+        start = time.perf_counter()
+        try:
+            if self.cache is None:
+                layout = self._import(page, fresh)
+            else:
+                layout = self._build_cached(page, fresh)
+        except ImportError as e:
+            if fresh:
+                raise
+            logger.error(f"Erreur lors du chargement de {page}: {str(e)}")
+            return html.Div(f"Erreur : Module {page} non trouvé", style={'color': 'red'})
+        elapsed = time.perf_counter() - start
+        metrics.PAGE_BUILD_SECONDS.observe(elapsed, page=page)
+        logger.info(f"Page {page} construite en {elapsed * 1000:.0f} ms")
+        return layout
+
+    def _import(self, page, fresh=False):
+        logger.info(f"Chargement du module {page}")
+        if not fresh:
+            return importlib.import_module(page).layout
+        # Nouvelle exécution du module dans un objet distinct : l'ancien reste intact (et utilisé par
+        # les requêtes en cours) jusqu'au remplacement dans sys.modules, une fois la page complète
+        spec = importlib.util.spec_from_file_location(page, os.path.join(ROOT_DIR, f"{page}.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[page] = module
+        return module.layout
+
+    # Clé de cache : code, fichiers de données et date du jour pour les pages marquées "daily"
+    def key(self, page):
+        page_data = self.page_names[page]
+        salt = datetime.date.today().isoformat() if page_data.get('daily') else ''
+        return page_key(page, page_data.get('data', []), salt=salt)
+
+    # Le layout sérialisé est lu depuis le cache disque s'il existe pour la clé courante ;
+    # sinon un seul worker le construit pendant que les autres attendent le verrou
+    def _build_cached(self, page, fresh=False):
+        key = self.key(page)
+        data = self.cache.load(page, key)
+        if data is None:
+            with self.cache.lock(page):
+                data = self.cache.load(page, key)
+                if data is None:
+                    metrics.cache_access('layout', hit=False)
+                    layout = self._import(page, fresh)
+                    self.cache.store(page, key, to_json_plotly(layout).encode())
+                    return layout
+        metrics.cache_access('layout', hit=True)
+        logger.info(f"Page {page} chargée depuis le cache ({len(data)} octets)")
+        return json.loads(data)
+
+    # Reconstruit une page (données ou date modifiées) puis remplace son layout en une seule affectation :
+    # les requêtes en cours gardent l'ancien layout, les suivantes reçoivent le nouveau, jamais un état
+    # intermédiaire. Les séries complètes des graphiques (zoom) sont préparées à part et remplacées avec
+    # le layout. En cas d'erreur, l'ancien layout et ses séries restent en place.
+    def rebuild(self, page):
+        module = sys.modules.get(page)
+        with zoom.staging() as staged:
+            layout = self._build(page, fresh=True)
+        if sys.modules.get(page) is module:
+            # Layout relu depuis le cache (construit par un autre worker) : l'ancien module ne correspond plus
+            sys.modules.pop(page, None)
+        if page in self._frozen:
+            self._frozen[page] = json.loads(to_json_plotly(layout))
+            sys.modules.pop(page, None)
+        else:
+            self._layouts[page] = layout
+        zoom.install(page, staged)
+        return layout
+
+    # Construit toutes les pages dans un thread d'arrière-plan pour que les premières
+    # visites ne paient pas le coût de construction, sans retarder le démarrage du worker
+    def warm_up(self, background=True):
+        def run():
+            start = time.perf_counter()
+            for page in self.page_names:
+                self.get(page)
+            elapsed = (time.perf_counter() - start) * 1000
+            logger.info(f"Préchauffage des pages terminé en {elapsed:.0f} ms")
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="page-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    # Mode préchargement (gunicorn --preload) : toutes les pages sont construites dans le processus maître
+    # puis converties une fois en objets JSON (dictionnaires, listes, chaînes), bien plus compacts que les
+    # arbres de composants et les DataFrames des modules de page. Après le fork, les workers les servent
+    # tels quels, sans décodage par requête, et les partagent en copie sur écriture.
+    def preload(self):
+        start = time.perf_counter()
+        size = 0
+        for page in self.page_names:
+            data = to_json_plotly(self.get(page))
+            size += len(data)
+            self._frozen[page] = json.loads(data)
+            self._layouts.pop(page, None)
+            # Les DataFrames des modules de page ne servent plus une fois le layout sérialisé
+            sys.modules.pop(page, None)
+        gc.collect()
+        # Les objets survivants sont exclus du ramasse-miettes : ses passages ne réécrivent plus
+        # leurs en-têtes dans les workers, ce qui préserve le partage des pages mémoire
+        gc.freeze()
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f"Préchargement de {len(self._frozen)} pages ({size} octets) en {elapsed:.0f} ms")
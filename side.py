@@ -1,37 +1,195 @@
+# Ingestion de l'export JSON hash rate / prix du BTC (data/hash-rate.json) dans data/data_hash_price.csv, la copie
+# durable lue par page6 (clé de cache de la page et rafraîchissement en dépendent), et dans la série binaire
+# correspondante ('data_hash_price', voir timeseries.py), reconstruite depuis le CSV si le cache disque est vidé.
+# Lancement depuis la racine du dépôt : python side.py [--input data/hash-rate.json] [--resume] [--csv CSV]
+import argparse
 import json
+import logging
+import os
+import stat
+import tempfile
+from array import array
+
+import numpy as np
 import pandas as pd
-from datetime import datetime
 
-# Vos données JSON (remplacez ceci par votre JSON ou chargez-le depuis un fichier)
-with open("data/hash-rate.json", "r") as f:
-    data = json.load(f)
+from cache import ROOT_DIR
+from timeseries import load_series, write_series
+
+logger = logging.getLogger(__name__)
+
+SERIES_NAME = 'data_hash_price'
+CSV_PATH = 'data/data_hash_price.csv'
+# Clés du JSON -> colonnes de la série
+COLUMNS = {'hash-rate': 'hash_rate', 'market-price': 'market_price'}
+CHUNK_SIZE = 1 << 16
+MS_PER_DAY = 86_400_000
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+# --- Lecture en flux : le fichier est lu par blocs et chaque élément des tableaux de premier niveau est décodé
+# séparément (json.JSONDecoder.raw_decode), sans charger tout le document en mémoire ---
+class _Reader:
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(CHUNK_SIZE)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.eof = not chunk
+        return bool(chunk)
+
+    def peek(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in _WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"JSON invalide : '{char}' attendu à la position {self.position}")
+        self.position += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Un nombre en fin de bloc peut être tronqué : on relit tant que le fichier n'est pas terminé
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.position = end
+            return value
+
+
+def iter_series(f, keys):
+    reader = _Reader(f)
+    reader.expect('{')
+    while reader.peek() != '}':
+        key = reader.value()
+        reader.expect(':')
+        if key in keys and reader.peek() == '[':
+            reader.expect('[')
+            while reader.peek() != ']':
+                yield key, reader.value()
+                if reader.peek() == ',':
+                    reader.expect(',')
+            reader.expect(']')
+        else:
+            reader.value()
+        if reader.peek() == ',':
+            reader.expect(',')
+
+
+# Points [timestamp_ms, valeur] ou {"x": timestamp_ms, "y": valeur} de chaque série, postérieurs au jour
+# after[clé] s'il est donné (jours depuis 1970, UTC)
+def read_points(path, after=None):
+    timestamps = {key: array('d') for key in COLUMNS}
+    values = {key: array('d') for key in COLUMNS}
+    with open(path, 'r') as f:
+        for key, point in iter_series(f, COLUMNS):
+            timestamp, value = (point['x'], point['y']) if isinstance(point, dict) else point[:2]
+            timestamps[key].append(timestamp)
+            values[key].append(np.nan if value is None else value)
+
+    points = {}
+    for key in COLUMNS:
+        # Conversion vectorisée des millisecondes en jours entiers
+        days = np.floor_divide(np.frombuffer(timestamps[key], dtype=np.float64), MS_PER_DAY).astype(np.int64)
+        data = np.frombuffer(values[key], dtype=np.float64)
+        if after and after.get(key) is not None:
+            keep = days > after[key]
+            days, data = days[keep], data[keep]
+        points[key] = (days, data)
+    return points
+
+
+# --- Jointure externe des séries sur les jours (dernière valeur retenue si plusieurs points le même jour) ---
+def join_on_days(points):
+    days = np.unique(np.concatenate([series_days for series_days, _ in points.values()]))
+    columns = {}
+    for key, (series_days, data) in points.items():
+        order = np.argsort(series_days, kind='stable')
+        series_days, data = series_days[order], data[order]
+        last = np.r_[series_days[1:] != series_days[:-1], True] if len(series_days) else np.zeros(0, dtype=bool)
+        column = np.full(len(days), np.nan)
+        column[np.searchsorted(days, series_days[last])] = data[last]
+        columns[COLUMNS[key]] = column
+    return days, columns
+
+
+# Dernier jour renseigné d'une colonne de la série existante
+def _last_day(store, column):
+    filled = np.flatnonzero(~np.isnan(store[column]))
+    return int(store.dates[filled[-1]]) if len(filled) else None
 
-# Extraire les données de hash-rate et market-price
-hash_rate_data = data["hash-rate"]
-market_price_data = data["market-price"]
 
-# Convertir les données en DataFrame
-hash_rate_df = pd.DataFrame(hash_rate_data)
-market_price_df = pd.DataFrame(market_price_data)
+# --- Réécriture atomique du CSV (fichier temporaire puis renommage) : le rafraîchissement des pages ne lit jamais
+# un fichier à moitié écrit. Renvoie la date de modification du fichier écrit ---
+def write_csv(csv_path, days, columns):
+    full_path = os.path.join(ROOT_DIR, csv_path)
+    frame = pd.DataFrame({'Date': days.astype('datetime64[D]').astype(str), **columns})
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(full_path))
+    with os.fdopen(fd, 'w', newline='') as f:
+        frame.to_csv(f, index=False)
+    # mkstemp crée le fichier en 0600 : les droits du fichier remplacé sont conservés
+    mode = stat.S_IMODE(os.stat(full_path).st_mode) if os.path.exists(full_path) else 0o644
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, full_path)
+    return os.stat(full_path).st_mtime_ns
 
-# Renommer les colonnes
-hash_rate_df.columns = ["timestamp", "hash_rate"]
-market_price_df.columns = ["timestamp", "market_price"]
 
-# Convertir les timestamps (en millisecondes) en dates
-hash_rate_df["timestamp"] = hash_rate_df["timestamp"].apply(lambda x: datetime.fromtimestamp(x / 1000).strftime('%Y-%m-%d'))
-market_price_df["timestamp"] = market_price_df["timestamp"].apply(lambda x: datetime.fromtimestamp(x / 1000).strftime('%Y-%m-%d'))
+def ingest(path, resume=False, csv_path=CSV_PATH):
+    resumable = resume and os.path.exists(os.path.join(ROOT_DIR, csv_path))
+    existing = load_series(SERIES_NAME, csv_path, 'Date') if resumable else None
+    if existing is None or not len(existing):
+        days, columns = join_on_days(read_points(path))
+    else:
+        # Reprise : chaque série repart de son propre dernier jour renseigné
+        after = {key: _last_day(existing, column) for key, column in COLUMNS.items()}
+        new_days, new_columns = join_on_days(read_points(path, after))
+        logger.info(f"Reprise : {len(new_days)} jour(s) à compléter ou ajouter")
+        if not len(new_days):
+            return existing
+        days = np.union1d(existing.dates, new_days)
+        columns = {}
+        for column, values in new_columns.items():
+            merged = np.full(len(days), np.nan)
+            merged[np.searchsorted(days, existing.dates)] = existing[column]
+            filled = ~np.isnan(values)
+            merged[np.searchsorted(days, new_days[filled])] = values[filled]
+            columns[column] = merged
+    # Série datée du CSV écrit : timeseries.load_series la considère à jour tant que le CSV ne change pas
+    updated_ns = write_csv(csv_path, days, columns)
+    return write_series(SERIES_NAME, days.astype('datetime64[D]'), columns, updated_ns=updated_ns)
 
-# Fusionner les deux DataFrames sur la colonne timestamp
-merged_df = pd.merge(hash_rate_df, market_price_df, on="timestamp", how="outer")
 
-# Renommer la colonne timestamp en Date
-merged_df = merged_df.rename(columns={"timestamp": "Date"})
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion du JSON hash rate / prix dans la série de page6")
+    parser.add_argument('--input', default='data/hash-rate.json', help="export JSON (data/hash-rate.json par défaut)")
+    parser.add_argument('--resume', action='store_true',
+                        help="n'ajoute que les jours postérieurs à la dernière date de la série existante")
+    parser.add_argument('--csv', default=CSV_PATH,
+                        help=f"CSV durable de la série (Date,hash_rate,market_price), {CSV_PATH} par défaut")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
 
-# Trier par date
-merged_df = merged_df.sort_values("Date")
+    store = ingest(args.input, resume=args.resume, csv_path=args.csv)
+    logger.info(f"Série {SERIES_NAME} : {len(store)} jours, version {store.version}, écrite dans '{args.csv}'")
 
-# Sauvegarder en CSV
-merged_df.to_csv("data.csv", index=False)
 
-print("Le fichier 'data.csv' a été créé avec succès !")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
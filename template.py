@@ -1,23 +1,34 @@
 from dash import dcc, html
 
+from theme import TEMPLATE
+
 
 class Page:
-    def __init__(self, grid_layout):
+    # name : nom du module de page, préfixe des identifiants des cartes (en navigation côté client, plusieurs
+    # pages sont montées en même temps dans le DOM)
+    def __init__(self, grid_layout, name):
         self.grid_layout = grid_layout
+        self.name = name
         self.graphs = {}
+        # Composants sans rendu (dcc.Store...) utilisés par les callbacks de la page
+        self.components = []
 
-    def create_dark_graph(self, figure):
+    def create_dark_graph(self, figure, component_id=None):
+        # Fonds, police, position du titre et marges viennent du thème (theme.py) : les valeurs propres
+        # à la figure sont retirées, le thème les imposant comme le faisaient les surcharges qu'il remplace
         figure.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='rgba(0, 0, 0, 0)',  # Transparent
-            plot_bgcolor='rgba(0, 0, 0, 0)',  # Transparent
-            font=dict(color='#ffffff', family="Arial, sans-serif"),
-            title=dict(x=0.5, y=0.98, xanchor='center', yanchor='top', pad=dict(t=20)),
-            margin=dict(l=20, r=20, t=40, b=20),
+            template=TEMPLATE,
+            paper_bgcolor=None,
+            plot_bgcolor=None,
+            font=dict(color=None, family=None),
+            title=dict(x=None, y=None, xanchor=None, yanchor=None, pad=None),
+            margin=None,
             autosize=True,
             width=None,
             height=None,
         )
+        # Un identifiant n'est nécessaire que pour les graphiques mis à jour par un callback
+        graph_kwargs = {} if component_id is None else {'id': component_id}
         return dcc.Graph(
             figure=figure,
             style={
@@ -31,11 +42,15 @@ class Page:
                 'responsive': True,
                 'autosizable': True,
                 'displayModeBar': False
-            }
+            },
+            **graph_kwargs
         )
 
-    def append(self, graph_id, figure):
-        self.graphs[graph_id] = self.create_dark_graph(figure)
+    def append(self, graph_id, figure, component_id=None):
+        self.graphs[graph_id] = self.create_dark_graph(figure, component_id)
+
+    def add_component(self, component):
+        self.components.append(component)
 
     def render(self):
         num_rows = len(self.grid_layout)
@@ -64,7 +79,7 @@ class Page:
         grid_container = html.Div(
             [html.Div(
                 self.graphs[graph_id],
-                id=f'graph-card-{graph_id}',  # ID unique pour chaque carte
+                id=f'{self.name}-graph-card-{graph_id}',  # ID unique pour chaque carte, toutes pages confondues
                 className='graph-card',  # Classe pour le JavaScript
                 style={
                     'gridArea': graph_id,
@@ -79,7 +94,7 @@ class Page:
                     'transition': 'transform 0.2s ease',  # Transition fluide
                 })
                 for graph_id in unique_ids if graph_id in self.graphs
-            ],
+            ] + self.components,
             style=grid_style
         )
         return grid_container
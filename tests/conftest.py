@@ -0,0 +1,6 @@
+# Les modules de l'application sont à la racine du dépôt (comme pour benchmarks/)
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,34 @@
+# Répertoire du cache : créé privé, refusé s'il est modifiable par d'autres utilisateurs ou n'est pas un répertoire
+import os
+import stat
+
+import pytest
+
+from cache import private_directory
+
+posix_only = pytest.mark.skipif(not hasattr(os, 'getuid'), reason="propriétaires POSIX")
+
+
+@posix_only
+def test_private_directory_is_created_with_owner_only_access(tmp_path):
+    path = private_directory(str(tmp_path / 'cache'))
+    assert stat.S_IMODE(os.stat(path).st_mode) & 0o077 == 0
+
+
+@posix_only
+def test_private_directory_refuses_directory_writable_by_others(tmp_path):
+    path = tmp_path / 'shared'
+    path.mkdir()
+    path.chmod(0o777)
+    with pytest.raises(RuntimeError):
+        private_directory(str(path))
+
+
+@posix_only
+def test_private_directory_refuses_symlink(tmp_path):
+    target = tmp_path / 'target'
+    target.mkdir(mode=0o700)
+    link = tmp_path / 'link'
+    link.symlink_to(target)
+    with pytest.raises(RuntimeError):
+        private_directory(str(link))
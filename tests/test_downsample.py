@@ -0,0 +1,57 @@
+# Séries complètes des graphiques sous-échantillonnés : rouvertes depuis le disque par un worker qui n'a pas
+# exécuté le module de page (layout relu depuis le cache), avec les mêmes points qu'après la construction
+import numpy as np
+import pandas as pd
+
+import downsample
+import timeseries
+import zoom
+
+
+def test_window_reopens_full_series_from_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeseries, 'SERIES_DIR', str(tmp_path))
+    monkeypatch.setattr(zoom, '_series', {})
+    dates = pd.date_range('2000-01-01', periods=5000)
+    df = pd.DataFrame({'date': dates, 'value': np.sin(np.arange(5000) / 50)})
+
+    downsample.downsampled_line(df, x='date', y='value', key='page:serie')
+    built = downsample.window('page:serie', '2005-01-01', '2006-01-01', threshold=100)
+
+    # Nouveau worker : aucune série en mémoire
+    monkeypatch.setattr(zoom, '_series', {})
+    reopened = downsample.window('page:serie', '2005-01-01', '2006-01-01', threshold=100)
+    np.testing.assert_array_equal(built[0], reopened[0])
+    np.testing.assert_array_equal(built[1], reopened[1])
+    assert len(reopened[0]) == 100
+
+
+def test_window_without_series_returns_none(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeseries, 'SERIES_DIR', str(tmp_path))
+    monkeypatch.setattr(zoom, '_series', {})
+    assert downsample.window('page:absente') is None
+
+
+def test_rebuild_swaps_series_only_after_success(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeseries, 'SERIES_DIR', str(tmp_path))
+    monkeypatch.setattr(zoom, '_series', {})
+    dates = pd.date_range('2000-01-01', periods=100)
+    downsample.downsampled_line(pd.DataFrame({'date': dates, 'value': np.zeros(100)}), x='date', y='value',
+                                key='page:serie')
+    old = zoom._series['page:serie']
+
+    # Reconstruction interrompue : les séries de l'ancien layout restent servies
+    try:
+        with zoom.staging():
+            downsample.downsampled_line(pd.DataFrame({'date': dates, 'value': np.ones(100)}), x='date', y='value',
+                                        key='page:serie')
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert zoom._series['page:serie'] is old
+
+    with zoom.staging() as staged:
+        downsample.downsampled_line(pd.DataFrame({'date': dates, 'value': np.ones(100)}), x='date', y='value',
+                                    key='page:serie')
+    assert zoom._series['page:serie'] is old
+    zoom.install('page', staged)
+    np.testing.assert_array_equal(downsample.window('page:serie')[1], np.ones(100))
@@ -0,0 +1,83 @@
+# Mise à jour incrémentale des séries FRED contre un serveur HTTP local qui imite fredgraph.csv : filtre cosd,
+# validateurs ETag / Last-Modified et réponses 304
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import fred
+
+ETAG = '"t10yie-v1"'
+LAST_MODIFIED = 'Mon, 06 Jan 2025 08:00:00 GMT'
+OBSERVATIONS = [('2025-01-01', '2.30'), ('2025-01-02', '2.31'), ('2025-01-03', '.'), ('2025-01-06', '2.35')]
+
+
+class StubFred(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        StubFred.requests.append({'query': query, 'headers': dict(self.headers)})
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        rows = [(date, value) for date, value in OBSERVATIONS if date >= query.get('cosd', '')]
+        body = ''.join([f"observation_date,{query['id']}\n"] + [f"{date},{value}\n" for date, value in rows]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', ETAG)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubFred.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubFred)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/graph/fredgraph.csv"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def series_file(tmp_path, monkeypatch):
+    path = tmp_path / 'T10YIE.csv'
+    path.write_bytes(b'observation_date,T10YIE\n2024-12-31,2.29\n2025-01-01,2.30\n')
+    monkeypatch.setattr(fred, 'SERIES', {'T10YIE': str(path)})
+    monkeypatch.setattr(fred, 'STATE_PATH', str(tmp_path / 'state.json'))
+    return path
+
+
+def test_only_new_rows_are_appended(stub_url, series_file):
+    before = series_file.read_bytes()
+
+    assert fred.update_all(base_url=stub_url) == {'T10YIE': 3}
+
+    assert StubFred.requests[0]['query'] == {'id': 'T10YIE', 'cosd': '2025-01-02'}
+    content = series_file.read_bytes()
+    assert content.startswith(before)
+    assert content[len(before):] == b'2025-01-02,2.31\n2025-01-03,\n2025-01-06,2.35\n'
+
+
+def test_validators_are_sent_back_and_304_leaves_file_untouched(stub_url, series_file):
+    fred.update_all(base_url=stub_url)
+    # À jour : la réponse vide (aucune observation après cosd) fournit les validateurs
+    assert fred.update_all(base_url=stub_url) == {'T10YIE': 0}
+    content, mtime = series_file.read_bytes(), series_file.stat().st_mtime_ns
+
+    assert fred.update_all(base_url=stub_url) == {'T10YIE': 0}
+
+    headers = StubFred.requests[-1]['headers']
+    assert headers['If-None-Match'] == ETAG
+    assert headers['If-Modified-Since'] == LAST_MODIFIED
+    assert series_file.read_bytes() == content
+    assert series_file.stat().st_mtime_ns == mtime
@@ -0,0 +1,99 @@
+# Tracés géodésiques : coupure à l'antiméridien, calcul vectorisé des destinations comparé à la formule point par
+# point, et cercles mémorisés (lru_cache)
+import math
+
+import numpy as np
+import pytest
+
+import geodesic
+
+
+def segments(lats, lons):
+    breaks = np.flatnonzero(np.isnan(lons))
+    return [(lat, lon) for lat, lon in zip(np.split(lats, breaks), np.split(lons, breaks))
+            if len(lon) and not np.isnan(lon).all()]
+
+
+def strip(parts):
+    return [(lat[~np.isnan(lat)], lon[~np.isnan(lon)]) for lat, lon in parts]
+
+
+@pytest.mark.parametrize('trace', [
+    geodesic.circle(10.0, 175.0, 1500),
+    geodesic.circle(-40.0, -178.0, 800),
+    geodesic.great_circle((35.7, 139.7), (37.8, -122.4)),
+])
+def test_antimeridian_crossing_is_split_without_wraparound(trace):
+    lats, lons = trace
+    parts = strip(segments(lats, lons))
+
+    assert len(parts) >= 2
+    for lat, lon in parts:
+        assert np.all((lon >= -180) & (lon <= 180))
+        assert np.all(np.abs(np.diff(lon)) < 180)
+    # Chaque coupure est fermée sur la ligne de changement de date, à la même latitude des deux côtés
+    edges = np.flatnonzero(np.isnan(lons))
+    for edge in edges:
+        if abs(lons[edge - 1]) == 180:
+            assert lons[edge + 1] == -lons[edge - 1]
+            assert lats[edge + 1] == lats[edge - 1]
+
+
+def test_circle_away_from_antimeridian_is_one_segment():
+    lats, lons = geodesic.circle(48.8, 2.3, 1000)
+    assert not np.isnan(lons).any()
+    assert len(lons) == geodesic.RESOLUTION
+
+
+# Formule directe pour un seul point, en flottants Python
+def destination_point(lat, lon, distance_km, bearing):
+    lat, lon, delta = math.radians(lat), math.radians(lon), distance_km / geodesic.EARTH_RADIUS_KM
+    lat2 = math.asin(math.sin(lat) * math.cos(delta) + math.cos(lat) * math.sin(delta) * math.cos(bearing))
+    lon2 = lon + math.atan2(math.sin(bearing) * math.sin(delta) * math.cos(lat),
+                            math.cos(delta) - math.sin(lat) * math.sin(lat2))
+    return math.degrees(lat2), math.degrees(lon2)
+
+
+def test_batched_destinations_match_per_point_formula():
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(-80, 80, (5, 1)), rng.uniform(-180, 180, (5, 1))
+    radii = rng.uniform(10, 9000, (5, 1))
+    bearings = np.linspace(0, 2 * np.pi, 17)[None, :]
+
+    batch_lats, batch_lons = geodesic.destination(lats, lons, radii, bearings)
+
+    assert batch_lats.shape == (5, 17)
+    for i in range(5):
+        for j in range(17):
+            expected = destination_point(lats[i, 0], lons[i, 0], radii[i, 0], bearings[0, j])
+            np.testing.assert_allclose((batch_lats[i, j], batch_lons[i, j]), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_batched_circles_match_single_circles():
+    centers = [(26.6, 106.6), (48.8, 2.3), (-33.9, 151.2)]
+    lats, lons = geodesic.circles(centers, [500, 1000, 1500])
+    parts = segments(lats, lons)
+
+    assert len(parts) == len(centers)
+    for (lat, lon), center, radius in zip(parts, centers, [500, 1000, 1500]):
+        single = geodesic.circle(*center, radius)
+        np.testing.assert_allclose(lat[~np.isnan(lat)], single[0])
+        np.testing.assert_allclose(lon[~np.isnan(lon)], single[1])
+
+
+def test_repeated_calls_hit_the_cache():
+    geodesic._circles.cache_clear()
+    geodesic._great_circles.cache_clear()
+
+    first = geodesic.circle(26.6, 106.6, 4100)
+    second = geodesic.circle(26.6, 106.6, 4100)
+    geodesic.great_circle((0, 0), (10, 10))
+    geodesic.great_circle((0, 0), (10, 10))
+
+    assert geodesic._circles.cache_info().hits == 1
+    assert geodesic._circles.cache_info().misses == 1
+    assert geodesic._great_circles.cache_info().hits == 1
+    assert second[0] is first[0]
+    # Tableaux partagés par le cache : en lecture seule
+    with pytest.raises(ValueError):
+        first[0][0] = 0.0
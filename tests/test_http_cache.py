@@ -0,0 +1,133 @@
+# Compression et ETag des réponses : négociation Accept-Encoding (q=0, *), Vary, 304 sur If-None-Match pour les
+# GET, et réponses des callbacks (POST) compressées à niveau modéré, sans ETag
+import gzip
+import json
+
+import flask
+import pytest
+
+import http_cache
+
+BODY = json.dumps({'points': list(range(2000))})
+
+
+class FakeBrotli:
+    def __init__(self):
+        self.qualities = []
+
+    def compress(self, body, quality):
+        self.qualities.append(quality)
+        return b'br:' + body
+
+
+@pytest.fixture
+def brotli(monkeypatch):
+    fake = FakeBrotli()
+    monkeypatch.setattr(http_cache, 'brotli', fake)
+    return fake
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(http_cache, '_compressed', http_cache.OrderedDict())
+    server = flask.Flask(__name__)
+    state = {'body': BODY}
+
+    @server.route('/layout', methods=['GET', 'POST'])
+    def layout():
+        return flask.Response(state['body'], mimetype='application/json')
+
+    @server.route('/small')
+    def small():
+        return flask.jsonify(ok=True)
+
+    http_cache.install(server)
+    client = server.test_client()
+    client.state = state
+    return client
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip, deflate, br', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+    ('gzip;q=0, br;q=0', None),
+    ('*', 'br'),
+    ('br;q=0, *', 'gzip'),
+    ('*;q=0', None),
+    ('gzip;q=0, *;q=0.5', 'br'),
+    ('identity', None),
+    ('', None),
+    (None, None),
+    ('gzip;q=abc', None),
+])
+def test_negotiation(brotli, accept_encoding, expected):
+    assert http_cache._negotiate(accept_encoding) == expected
+
+
+def test_negotiation_without_brotli(monkeypatch):
+    monkeypatch.setattr(http_cache, 'brotli', None)
+    assert http_cache._negotiate('br') is None
+    assert http_cache._negotiate('br, gzip;q=0.1') == 'gzip'
+    assert http_cache._negotiate('*') == 'gzip'
+
+
+def test_get_is_compressed_and_revalidated(client, monkeypatch):
+    monkeypatch.setattr(http_cache, 'brotli', None)
+    response = client.get('/layout', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data).decode() == BODY
+    etag = response.headers['ETag']
+    assert etag.endswith('-gzip"')
+
+    revalidated = client.get('/layout', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+    assert 'Accept-Encoding' in revalidated.headers['Vary']
+
+    # Contenu modifié : l'ancien ETag ne correspond plus
+    client.state['body'] = BODY.replace('1999', '-1')
+    changed = client.get('/layout', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_uncompressed_response_keeps_vary_and_etag(client):
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert client.get('/small', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+    identity = client.get('/layout', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in identity.headers
+    assert identity.data.decode() == BODY
+
+
+def test_post_has_no_etag_and_moderate_level(client, brotli):
+    response = client.post('/layout', headers={'Accept-Encoding': 'br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert response.data == b'br:' + BODY.encode()
+    assert 'ETag' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+    client.get('/layout', headers={'Accept-Encoding': 'br'})
+    assert brotli.qualities == [http_cache.LEVELS['POST']['br'], http_cache.LEVELS['GET']['br']]
+    # Même corps : servi depuis le cache des corps compressés
+    client.post('/layout', headers={'Accept-Encoding': 'br'})
+    assert len(brotli.qualities) == 2
+
+
+def test_post_gzip_level(client, monkeypatch):
+    monkeypatch.setattr(http_cache, 'brotli', None)
+    levels = []
+    compress = gzip.compress
+    monkeypatch.setattr(http_cache.gzip, 'compress',
+                        lambda body, compresslevel, mtime: levels.append(compresslevel) or compress(body, 1, mtime=mtime))
+    response = client.post('/layout', headers={'Accept-Encoding': 'gzip', 'If-None-Match': '*'})
+
+    assert response.status_code == 200
+    assert levels == [http_cache.LEVELS['POST']['gzip']]
+    assert gzip.decompress(response.data).decode() == BODY
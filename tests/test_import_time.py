@@ -0,0 +1,34 @@
+# Démarrage d'un worker : "from app import server" n'importe aucun module lourd (NumPy, pandas, Plotly Express,
+# scikit-learn...) et son temps d'import cumulé (python -X importtime) reste sous RELATIVE_BUDGET fois celui de
+# "import dash", mesuré dans le même test. Le budget absolu, qui dépend de la machine, n'est vérifié que par
+# python -m benchmarks.check_import_time
+from benchmarks import check_import_time
+
+
+def test_app_import_does_not_load_heavy_modules():
+    entries = check_import_time.measure()
+
+    assert entries[-1]['name'] == check_import_time.TARGET
+    assert [chain for _, chain in check_import_time.heavy_imports(entries)] == []
+
+
+def test_app_import_time_is_within_budget_of_dash_import():
+    entries, total_ms, baseline_ms = check_import_time.measure_with_baseline()
+
+    assert entries[-1]['name'] == check_import_time.TARGET
+    assert total_ms <= check_import_time.RELATIVE_BUDGET * baseline_ms, \
+        f"import de app:server en {total_ms:.0f} ms, import de dash en {baseline_ms:.0f} ms"
+
+
+def test_heavy_import_is_reported_with_its_chain():
+    stderr = '\n'.join([
+        'import time: self [us] | cumulative | imported package',
+        'import time:       100 |        100 |       numpy.core',
+        'import time:       200 |        300 |     numpy',
+        'import time:        50 |        350 |   downsample',
+        'import time:        10 |        360 | app',
+    ])
+
+    found = check_import_time.heavy_imports(check_import_time.parse(stderr))
+
+    assert [chain for _, chain in found] == ['numpy <- downsample <- app']
@@ -0,0 +1,102 @@
+# Métriques Prometheus : format texte (buckets cumulés, +Inf, échappement des étiquettes), somme des fichiers
+# écrits par chaque worker, et sorties de callback inconnues regroupées sous UNKNOWN_CALLBACK
+import json
+import os
+
+import dash
+import pytest
+from dash import Input, Output, html
+
+import metrics
+
+
+@pytest.fixture
+def families(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_DIR', str(tmp_path))
+    monkeypatch.setattr(metrics, '_families', {})
+    return tmp_path
+
+
+def test_render_histogram_and_counter(families):
+    latency = metrics.histogram('latence_seconds', "Durée", buckets=(0.1, 1.0))
+    requests = metrics.counter('requetes_total', "Requêtes")
+    for value in (0.05, 0.1, 0.5, 3.0, 7.0):
+        latency.observe(value, route='/a')
+    requests.inc(route='chemin "cité"\\\n')
+    requests.inc(2, route='chemin "cité"\\\n')
+
+    text = metrics.render(metrics.collect())
+
+    assert text.splitlines() == [
+        '# HELP latence_seconds Durée',
+        '# TYPE latence_seconds histogram',
+        'latence_seconds_bucket{route="/a",le="0.1"} 2',
+        'latence_seconds_bucket{route="/a",le="1.0"} 3',
+        'latence_seconds_bucket{route="/a",le="+Inf"} 5',
+        'latence_seconds_sum{route="/a"} 10.65',
+        'latence_seconds_count{route="/a"} 5',
+        '# HELP requetes_total Requêtes',
+        '# TYPE requetes_total counter',
+        'requetes_total{route="chemin \\"cité\\"\\\\\\n"} 3',
+    ]
+
+
+def worker_file(directory, pid, observations):
+    worker = metrics.Histogram('latence_seconds', "Durée", buckets=(0.1, 1.0))
+    for value in observations:
+        worker.observe(value, route='/a')
+    snapshot = {'latence_seconds': {'type': 'histogram', 'help': "Durée", 'buckets': [0.1, 1.0],
+                                    'samples': worker.snapshot()}}
+    (directory / f"{pid}.json").write_text(json.dumps(snapshot))
+
+
+def test_collect_merges_worker_files(families):
+    latency = metrics.histogram('latence_seconds', "Durée", buckets=(0.1, 1.0))
+    latency.observe(0.5, route='/a')
+    worker_file(families, 1001, [0.05, 2.0])
+    worker_file(families, 1002, [0.05])
+    (families / '1003.json').write_text('{"tronqué')
+
+    merged = metrics.collect()
+
+    # Le fichier de ce processus est écrit à chaque lecture : les dernières valeurs y sont, sans attendre le flush
+    assert os.path.exists(families / f"{os.getpid()}.json")
+    value = merged['latence_seconds']['values'][(('route', '/a'),)]
+    assert value['counts'] == [2, 1, 1]
+    assert value['count'] == 4
+    assert value['sum'] == pytest.approx(2.6)
+
+    latency.observe(0.5, route='/a')
+    assert metrics.collect()['latence_seconds']['values'][(('route', '/a'),)]['count'] == 5
+
+
+def test_unknown_callback_outputs_collapse_to_one_label(families, monkeypatch):
+    app = dash.Dash(__name__)
+    app.layout = html.Div([html.Button(id='bouton'), html.Div(id='sortie')])
+
+    @app.callback(Output('sortie', 'children'), Input('bouton', 'n_clicks'))
+    def afficher(n_clicks):
+        return n_clicks
+
+    for name, family in (('CALLBACK_SECONDS', metrics.histogram('dash_callback_seconds', "Durée des callbacks")),
+                         ('RESPONSE_BYTES', metrics.histogram('dash_response_bytes', "Taille",
+                                                              buckets=metrics.SIZE_BUCKETS)),
+                         ('REQUEST_SECONDS', metrics.histogram('dash_http_request_seconds', "Durée des requêtes"))):
+        monkeypatch.setattr(metrics, name, family)
+    metrics.install(app)
+    client = app.server.test_client()
+
+    def post(output, component_id):
+        client.post('/_dash-update-component', json={
+            'output': output, 'outputs': {'id': component_id, 'property': 'children'},
+            'inputs': [{'id': 'bouton', 'property': 'n_clicks', 'value': 1}], 'changedPropIds': ['bouton.n_clicks']})
+
+    post('sortie.children', 'sortie')
+    for i in range(5):
+        post(f"inexistant-{i}.children", f"inexistant-{i}")
+
+    labels = [labels['callback'] for labels, _ in metrics.CALLBACK_SECONDS.snapshot()]
+    assert sorted(labels) == sorted(['afficher', metrics.UNKNOWN_CALLBACK])
+    counts = {labels['callback']: value['count'] for labels, value in metrics.CALLBACK_SECONDS.snapshot()}
+    assert counts == {'afficher': 1, metrics.UNKNOWN_CALLBACK: 5}
+    assert f'callback="{metrics.UNKNOWN_CALLBACK}"' in client.get('/metrics').get_data(as_text=True)
@@ -0,0 +1,78 @@
+# Ajustement polynomial en ligne : mises à jour par morceaux identiques à un ajustement unique, intervalle de
+# prédiction comparé à un calcul direct, et ajustement enregistré complété ou recalculé selon les données
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+import polyfit
+
+
+def series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / 365.25
+    return t, 2000 + 300 * t + 150 * t ** 2 + rng.normal(0, 500, n)
+
+
+@pytest.mark.parametrize('degree', [1, 2, 3])
+def test_chunked_updates_match_batch_least_squares(degree):
+    t, y = series(900)
+    fit = polyfit.OnlinePolynomialFit(degree)
+    for chunk in np.array_split(np.arange(len(t)), [1, 10, 11, 400, 650]):
+        fit.update(t[chunk], y[chunk])
+
+    expected = np.linalg.lstsq(np.vander(t, degree + 1, increasing=True), y, rcond=None)[0]
+    np.testing.assert_allclose(fit.coefficients, expected, rtol=1e-9)
+    np.testing.assert_allclose(fit.coefficients, np.polyfit(t, y, degree)[::-1], rtol=1e-9)
+    assert fit.n == len(t)
+
+
+def test_interval_matches_direct_computation():
+    t, y = series(500)
+    fit = polyfit.fit_polynomial(t[:200], y[:200], 2).update(t[200:], y[200:])
+    future = np.linspace(t[-1], t[-1] + 3, 7)
+
+    features = np.vander(t, 3, increasing=True)
+    coefficients = np.linalg.lstsq(features, y, rcond=None)[0]
+    variance = np.sum((y - features @ coefficients) ** 2) / (len(t) - 3)
+    new = np.vander(future, 3, increasing=True)
+    leverage = np.diag(new @ np.linalg.inv(features.T @ features) @ new.T)
+    spread = NormalDist().inv_cdf(0.975) * np.sqrt(variance * (1 + leverage))
+
+    lower, upper = fit.interval(future, 0.95)
+    np.testing.assert_allclose(lower, new @ coefficients - spread, rtol=1e-9)
+    np.testing.assert_allclose(upper, new @ coefficients + spread, rtol=1e-9)
+
+
+@pytest.fixture
+def fits(tmp_path, monkeypatch):
+    monkeypatch.setattr(polyfit, 'FIT_DIR', str(tmp_path))
+    refits = []
+    batch = polyfit.fit_polynomial
+    monkeypatch.setattr(polyfit, 'fit_polynomial', lambda t, y, degree: refits.append(len(t)) or batch(t, y, degree))
+    return refits
+
+
+def test_appended_rows_update_stored_fit(fits):
+    t, y = series(600)
+    polyfit.fitted('prix', t[:500], y[:500], model='numpy')
+    fit = polyfit.fitted('prix', t, y, model='numpy')
+
+    assert fits == [500]
+    np.testing.assert_allclose(fit.coefficients, np.polyfit(t, y, 2)[::-1], rtol=1e-9)
+    # Série inchangée : relue sans calcul
+    polyfit.fitted('prix', t, y, model='numpy')
+    assert fits == [500]
+
+
+@pytest.mark.parametrize('position', [0, 450, 499])
+def test_modified_prefix_triggers_full_refit(fits, position):
+    t, y = series(600)
+    polyfit.fitted('prix', t[:500], y[:500], model='numpy')
+    y = y.copy()
+    y[position] += 1000
+
+    fit = polyfit.fitted('prix', t, y, model='numpy')
+
+    assert fits == [500, 600]
+    np.testing.assert_allclose(fit.coefficients, np.polyfit(t, y, 2)[::-1], rtol=1e-9)
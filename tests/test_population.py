@@ -0,0 +1,92 @@
+# Rayon couvrant une part de la population (BallTree) comparé à un calcul exhaustif, et cercle de la page 5
+# recalculé sur les traces repérées par uid, autour d'un point cliqué n'importe où sur la carte
+import json
+import shutil
+import subprocess
+
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+import geodesic
+import population
+import population_map
+
+
+def haversine_km(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * geodesic.EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture
+def grid():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(-60, 70, 5000)
+    lons = rng.uniform(-180, 180, 5000)
+    return population.PopulationGrid(lats, lons, rng.pareto(1.5, 5000) * 1000)
+
+
+@pytest.mark.parametrize('center', [(26.6, 106.6), (48.8, 2.3), (-33.9, 151.2), (0.0, -179.5)])
+@pytest.mark.parametrize('share', [0.1, 0.5, 0.9])
+def test_radius_for_share_matches_exhaustive_search(grid, center, share):
+    lats, lons = np.degrees(np.asarray(grid.tree.data)).T
+    distances = haversine_km(*center, lats, lons)
+    order = np.argsort(distances, kind='stable')
+    cumulative = np.cumsum(grid.population[order])
+    expected = distances[order][np.searchsorted(cumulative, share * grid.total)]
+
+    assert grid.radius_for_share(*center, share) == pytest.approx(expected, rel=1e-9)
+
+
+def test_circle_patch_targets_traces_by_uid(grid, monkeypatch):
+    monkeypatch.setattr(population, 'load_grid', lambda: grid)
+    figure = go.Figure([go.Scattergeo(name='autre'), go.Choropleth(),
+                        go.Scattergeo(uid=population_map.CIRCLE_TRACE_UID),
+                        go.Scattergeo(uid=population_map.CENTER_TRACE_UID)])
+    traces = population_map.trace_indices(figure)
+    assert traces == {population_map.CIRCLE_TRACE_UID: 2, population_map.CENTER_TRACE_UID: 3}
+
+    patch = population_map.update_population_circle([48.8, 2.3], traces)
+    locations = {tuple(operation['location'][:2]) for operation in patch.to_plotly_json()['operations']}
+    assert locations == {('data', 2), ('data', 3)}
+
+
+# Écouteur de clic exécuté par Node avec un document, un graphique plotly et une projection simulés
+# (équirectangulaire, 2 pixels par degré, papier décalé de (10, 20) dans la page)
+CLICK_SCRIPT = """
+const listeners = {};
+const center = [];
+const paper = {getBoundingClientRect: () => ({left: 10, top: 20})};
+const graph = {
+    _fullLayout: {geo: {_subplot: {projection: {invert: ([x, y]) => [x / 2 - 180, 90 - y / 2]}}}},
+    querySelector: () => paper,
+};
+global.window = {};
+global.document = {addEventListener: (type, listener) => { listeners[type] = listener; }};
+global.dash_clientside = {no_update: null, set_props: (id, props) => center.push([id, props.data])};
+(%s)('population-map', 'population-center');
+const target = {closest: (selector) => selector === '#population-map .js-plotly-plot' ? graph : {}};
+for (const [x, y, moved] of %s) {
+    listeners.mousedown({clientX: x, clientY: y});
+    listeners.click({target: target, clientX: x + moved, clientY: y});
+}
+console.log(JSON.stringify(center));
+"""
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="Node.js absent")
+def test_click_anywhere_recenters_circle(grid, monkeypatch):
+    # Clic dans le Pacifique Sud (aucune ville ni trace), puis glissement de la carte : ignoré
+    clicks = [[10 + (180 - 140) * 2, 20 + (90 + 30) * 2, 0], [300, 200, 40]]
+    script = CLICK_SCRIPT % (population_map.CLICK_HANDLER, json.dumps(clicks))
+    output = subprocess.run(['node', '-e', script], check=True, capture_output=True, text=True).stdout
+    assert json.loads(output) == [[population_map.CENTER_ID, [-30, -140]]]
+
+    monkeypatch.setattr(population, 'load_grid', lambda: grid)
+    traces = {population_map.CENTER_TRACE_UID: 1, population_map.CIRCLE_TRACE_UID: 2}
+    patch = population_map.update_population_circle([-30, -140], traces)
+    updates = {tuple(operation['location']): operation['params']['value']
+               for operation in patch.to_plotly_json()['operations']}
+    assert updates[('data', 1, 'lat')] == [-30] and updates[('data', 1, 'lon')] == [-140]
+    assert updates[('data', 2, 'name')] == population.circle_label(grid.radius_for_share(-30, -140))
@@ -0,0 +1,200 @@
+# Rafraîchissement en arrière-plan : seules les pages déjà construites dont un fichier de données a changé sont
+# reconstruites, le nouveau layout remplace l'ancien d'un bloc (jamais de page à moitié construite), et les séries
+# complètes des graphiques (zoom) changent avec lui. Pages préchargées servies sans décodage par requête.
+import gc
+import sys
+import textwrap
+import threading
+
+import numpy as np
+import pytest
+
+import downsample
+import refresh
+import registry
+import timeseries
+import zoom
+from registry import PageRegistry
+
+# Page de test : un Div par ligne du fichier de données, construit lentement (sleep) pour que des lectures
+# concurrentes tombent pendant la reconstruction
+PAGE = '''
+import os
+import time
+
+from dash import html
+
+with open(os.path.join({root!r}, {data!r})) as f:
+    lines = f.read().split()
+if 'erreur' in lines:
+    raise RuntimeError('données invalides')
+children = []
+for line in lines:
+    time.sleep({delay})
+    children.append(html.Div(line))
+layout = html.Div(children, id='{name}')
+'''
+
+# Page de test avec un graphique sous-échantillonné ; la série servie au zoom pendant la construction est notée
+ZOOM_PAGE = '''
+import os
+
+import pandas as pd
+
+import zoom
+from downsample import downsampled_line
+
+with open(os.path.join({root!r}, {data!r})) as f:
+    value = float(f.read())
+df = pd.DataFrame({{'date': pd.date_range('2000-01-01', periods=50), 'value': [value] * 50}})
+figure = downsampled_line(df, x='date', y='value', key='{name}:serie')
+served_during_build = zoom.lookup('{name}:serie')
+if value < 0:
+    raise RuntimeError('données invalides')
+layout = figure
+'''
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, 'ROOT_DIR', str(tmp_path))
+    monkeypatch.setattr(refresh, 'ROOT_DIR', str(tmp_path))
+    monkeypatch.setattr(timeseries, 'SERIES_DIR', str(tmp_path / 'series'))
+    monkeypatch.setattr(zoom, '_series', {})
+    monkeypatch.syspath_prepend(str(tmp_path))
+    names = []
+
+    def page(name, data, template=PAGE, delay=0.0):
+        names.append(name)
+        source = template.format(root=str(tmp_path), data=data, name=name, delay=delay)
+        (tmp_path / f"{name}.py").write_text(textwrap.dedent(source))
+        return {'name': name, 'path': f"/{name}", 'data': [data]}
+
+    def write(data, content):
+        (tmp_path / data).write_text(content)
+
+    yield page, write
+    for name in names:
+        sys.modules.pop(name, None)
+
+
+def texts(layout):
+    return [child.children for child in layout.children]
+
+
+def test_data_change_rebuilds_only_built_pages(site):
+    page, write = site
+    write('a.txt', 'v1 v1')
+    write('b.txt', 'b')
+    pages = PageRegistry({'rp_a': page('rp_a', 'a.txt'), 'rp_b': page('rp_b', 'a.txt'),
+                          'rp_c': page('rp_c', 'b.txt')})
+    refresher = refresh.Refresher(pages, interval=0)
+    old_a, old_c = pages.get('rp_a'), pages.get('rp_c')
+
+    write('a.txt', 'v2 v2 v2')
+    refresher.refresh_once()
+
+    assert texts(pages.get('rp_a')) == ['v2', 'v2', 'v2']
+    # Page jamais visitée : construite à sa première visite, avec les données à jour
+    assert not pages.is_built('rp_b')
+    assert pages.get('rp_c') is old_c
+    assert old_a is not pages.get('rp_a')
+
+    # Aucun changement : rien n'est reconstruit
+    current = pages.get('rp_a')
+    refresher.refresh_once()
+    assert pages.get('rp_a') is current
+
+
+def test_failed_rebuild_keeps_old_layout(site):
+    page, write = site
+    write('a.txt', 'v1')
+    pages = PageRegistry({'rp_err': page('rp_err', 'a.txt')})
+    refresher = refresh.Refresher(pages, interval=0)
+    old = pages.get('rp_err')
+
+    write('a.txt', 'v2 erreur')
+    refresher.refresh_once()
+
+    assert pages.get('rp_err') is old
+    assert sys.modules['rp_err'].layout is old
+
+
+def test_readers_see_old_or_new_layout_never_partial(site):
+    page, write = site
+    size = 20
+    write('a.txt', ' '.join(['v1'] * size))
+    pages = PageRegistry({'rp_swap': page('rp_swap', 'a.txt', delay=0.005)})
+    refresher = refresh.Refresher(pages, interval=0)
+    pages.get('rp_swap')
+
+    seen = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            seen.append(texts(pages.get('rp_swap')))
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    write('a.txt', ' '.join(['v22'] * size))
+    refresher.refresh_once()
+    done.set()
+    for reader in readers:
+        reader.join()
+
+    assert {tuple(children) for children in seen} <= {('v1',) * size, ('v22',) * size}
+    assert ['v1'] * size in seen
+    assert texts(pages.get('rp_swap')) == ['v22'] * size
+
+
+def test_zoom_series_are_swapped_with_the_layout(site):
+    page, write = site
+    write('x.txt', '1')
+    pages = PageRegistry({'rp_zoom': page('rp_zoom', 'x.txt', template=ZOOM_PAGE)})
+    refresher = refresh.Refresher(pages, interval=0)
+    pages.get('rp_zoom')
+    old = zoom.lookup('rp_zoom:serie')
+
+    write('x.txt', '2.0')
+    refresher.refresh_once()
+
+    # Pendant la reconstruction, le zoom servait encore la série de l'ancien layout
+    assert sys.modules['rp_zoom'].served_during_build is old
+    assert zoom.lookup('rp_zoom:serie') is not old
+    np.testing.assert_array_equal(downsample.window('rp_zoom:serie')[1], np.full(50, 2.0))
+
+    # Reconstruction en échec : ancien layout et anciennes séries conservés
+    layout, series = pages.get('rp_zoom'), zoom.lookup('rp_zoom:serie')
+    write('x.txt', '-3')
+    refresher.refresh_once()
+    assert pages.get('rp_zoom') is layout
+    assert zoom.lookup('rp_zoom:serie') is series
+    np.testing.assert_array_equal(downsample.window('rp_zoom:serie')[1], np.full(50, 2.0))
+
+
+def test_preloaded_layout_is_served_without_parsing(site, monkeypatch):
+    page, write = site
+    write('a.txt', 'v1 v2')
+    pages = PageRegistry({'rp_pre': page('rp_pre', 'a.txt')})
+    refresher = refresh.Refresher(pages, interval=0)
+    monkeypatch.setattr(gc, 'freeze', lambda: None)
+    pages.preload()
+    assert 'rp_pre' not in sys.modules
+
+    def no_parsing(*args, **kwargs):
+        raise AssertionError('layout préchargé décodé à la requête')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(registry.json, 'loads', no_parsing)
+        layout = pages.get('rp_pre')
+        assert pages.get('rp_pre') is layout
+    assert [child['props']['children'] for child in layout['props']['children']] == ['v1', 'v2']
+
+    # Page préchargée reconstruite : remplacée d'un bloc, toujours sous forme d'objets JSON
+    write('a.txt', 'v1 v2 v3')
+    refresher.refresh_once()
+    layout = pages.get('rp_pre')
+    assert [child['props']['children'] for child in layout['props']['children']] == ['v1', 'v2', 'v3']
+    assert 'rp_pre' not in sys.modules
@@ -0,0 +1,123 @@
+# Équivalence de RegimeTracker.append (mise à jour incrémentale) avec un recalcul complet (rebuild) et avec le
+# calcul d'origine de la page 1 (np.select et cumsum des ruptures), sur des séries FRED synthétiques découpées
+# aléatoirement, dont certaines fins sont perturbées pour créer de nouveaux extrêmes.
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from regimes import M2_GROWTH, M2_REFERENCE_YEAR, RegimeTracker
+
+START_DATE = '2003-03-01'
+SEEDS = range(12)
+STEPS = 6
+
+
+def synthetic_series(rng, start='2003-01-01', end='2012-12-31'):
+    days = pd.date_range(start, end, freq='B')
+    months = pd.date_range(start, end, freq='MS')
+    t10yie = 2 + np.cumsum(rng.normal(0, 0.03, len(days)))
+    t10yie[rng.random(len(days)) < 0.02] = np.nan
+    m2sl = 6000 * np.cumprod(1 + rng.normal(0.005, 0.003, len(months)))
+    wtisplc = 60 + np.cumsum(rng.normal(0, 4, len(months)))
+    return (pd.DataFrame({'observation_date': days, 'T10YIE': t10yie}),
+            pd.DataFrame({'observation_date': months, 'M2SL': m2sl}),
+            pd.DataFrame({'observation_date': months, 'WTISPLC': np.abs(wtisplc) + 1}))
+
+
+# Fin de série multipliée à partir d'une date tirée au hasard : nouveaux minimums ou maximums en cours de route
+def perturb(rng, df, name):
+    df = df.copy()
+    cut = rng.integers(len(df) // 2, len(df))
+    df.loc[cut:, name] *= rng.choice([0.2, 3.0])
+    return df
+
+
+def before(df, date):
+    return df[(df['observation_date'] >= START_DATE) & (df['observation_date'] <= date)]
+
+
+# --- Calcul de référence : celui de la page 1 avant RegimeTracker ---
+def _quadrants(x, y):
+    conditions = [(x <= 0) & (y >= 0), (x > 0) & (y >= 0), (x <= 0) & (y < 0), (x > 0) & (y < 0)]
+    labels = np.select(conditions, ['Inflationary Bust', 'Inflationary Boom', 'Disinflationary Bust',
+                                    'Disinflationary Boom'], default='On Axis').astype(object)
+    colors = np.select(conditions, ['rgb(255,69,0)', 'rgb(255,105,180)', 'rgb(65,105,225)', 'rgb(50,205,50)'],
+                       default='gray').astype(object)
+    return labels, colors
+
+
+def reference(t10yie, m2sl, wtisplc):
+    combined = pd.merge(wtisplc, m2sl, on='observation_date')
+    growth = (1 + M2_GROWTH) ** (combined['observation_date'].dt.year - M2_REFERENCE_YEAR)
+    combined['ratio'] = combined['WTISPLC'] / (combined['M2SL'] * growth)
+    monthly = t10yie.groupby(t10yie['observation_date'].dt.to_period('M'))['T10YIE'].mean().reset_index()
+    monthly['observation_date'] = monthly['observation_date'].dt.to_timestamp()
+
+    ratio, inflation = combined['ratio'], monthly['T10YIE']
+    combined['ratio_normalized'] = 1 - 2 * (ratio - ratio.min()) / (ratio.max() - ratio.min())
+    monthly['T10YIE_normalized'] = 2 * (inflation - inflation.min()) / (inflation.max() - inflation.min()) - 1
+    df = pd.merge(combined[['observation_date', 'ratio_normalized']],
+                  monthly[['observation_date', 'T10YIE_normalized']],
+                  on='observation_date').sort_values('observation_date', ignore_index=True)
+
+    x, y = df['ratio_normalized'].to_numpy(), df['T10YIE_normalized'].to_numpy()
+    df['quad_label'], df['quad_color'] = _quadrants(x, y)
+    flip_x = np.abs(x) <= np.abs(y)
+    closest_label, closest_color = _quadrants(np.where(flip_x, -x, x), np.where(flip_x, y, -y))
+    on_axis = (x == 0) | (y == 0)
+    closest_label[on_axis], closest_color[on_axis] = 'On Axis', 'gray'
+    df['closest_label'], df['closest_color'] = closest_label, closest_color
+    df['distance'] = np.sqrt(df['ratio_normalized'] ** 2 + df['T10YIE_normalized'] ** 2)
+
+    change = (df['quad_label'] != df['quad_label'].shift()) | (df['closest_label'] != df['closest_label'].shift())
+    groups = df.groupby(change.cumsum(), sort=False)
+    first, last = groups['observation_date'].min(), groups['observation_date'].max()
+    dmin, dmax = first.dt.strftime('%Y-%m'), last.dt.strftime('%Y-%m')
+    clustered = pd.DataFrame({
+        'start_date': first.to_numpy(),
+        'hover_label': np.where(dmin == dmax, dmin, dmin + ' à ' + dmax).astype(object),
+        'avg_dist': groups['distance'].mean().to_numpy(),
+        'quad_label': groups['quad_label'].first().to_numpy(),
+        'quad_color': groups['quad_color'].first().to_numpy(),
+        'closest_label': groups['closest_label'].first().to_numpy(),
+        'closest_color': groups['closest_color'].first().to_numpy(),
+    })
+    return df, clustered
+
+
+# Régimes identiques, distances moyennes égales aux arrondis près (l'ordre de sommation peut différer)
+def assert_regimes_equal(actual, expected):
+    assert_frame_equal(actual.drop(columns='avg_dist'), expected.drop(columns='avg_dist'), check_exact=True)
+    np.testing.assert_allclose(actual['avg_dist'], expected['avg_dist'], rtol=1e-12)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_append_matches_rebuild_and_reference(seed):
+    rng = np.random.default_rng(seed)
+    t10yie, m2sl, wtisplc = synthetic_series(rng)
+    if seed % 2:
+        t10yie, wtisplc = perturb(rng, t10yie, 'T10YIE'), perturb(rng, wtisplc, 'WTISPLC')
+
+    days = t10yie['observation_date']
+    cuts = np.sort(rng.choice(days.iloc[len(days) // 10:].to_numpy(), STEPS, replace=False))
+    tracker = RegimeTracker(START_DATE)
+    for cut in cuts:
+        # Séries mensuelles publiées avec un retard aléatoire sur la série quotidienne
+        lag = pd.Timedelta(days=int(rng.integers(0, 60)))
+        frames = {'t10yie': before(t10yie, cut), 'm2sl': before(m2sl, cut - lag),
+                  'wtisplc': before(wtisplc, cut - pd.Timedelta(days=int(rng.integers(0, 60))))}
+        # Une série peut ne rien apporter à une étape donnée
+        frames = {name: df for name, df in frames.items() if rng.random() > 0.2}
+        tracker.append(**frames)
+
+        full = RegimeTracker(START_DATE)
+        full.series = {name: df.copy() for name, df in tracker.series.items()}
+        full.rebuild()
+        assert_frame_equal(tracker.normalized, full.normalized, check_exact=True)
+        assert_regimes_equal(tracker.clustered, full.clustered)
+
+        normalized, clustered = reference(tracker.series['T10YIE'], tracker.series['M2SL'],
+                                          tracker.series['WTISPLC'])
+        assert_frame_equal(tracker.normalized, normalized)
+        assert_regimes_equal(tracker.clustered, clustered)
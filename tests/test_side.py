@@ -0,0 +1,41 @@
+# Ingestion du JSON hash rate / prix : CSV durable réécrit à chaque ingestion, série binaire reconstruite depuis
+# ce CSV si le cache disque est vidé
+import json
+
+import numpy as np
+
+import side
+import timeseries
+
+MS_PER_DAY = 86_400_000
+
+
+def write_export(path, days, hash_rates, prices):
+    path.write_text(json.dumps({
+        'metric1': 'hash-rate',
+        'hash-rate': [[day * MS_PER_DAY, value] for day, value in zip(days, hash_rates)],
+        'market-price': [{'x': day * MS_PER_DAY + 3600_000, 'y': value} for day, value in zip(days, prices)],
+    }))
+
+
+def test_ingest_writes_durable_csv_and_resumes(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeseries, 'SERIES_DIR', str(tmp_path / 'series'))
+    csv_path = str(tmp_path / 'data_hash_price.csv')
+    export = tmp_path / 'hash-rate.json'
+    write_export(export, [19000, 19001, 19002], [1.5, 2.5, None], [100.0, 101.0, 102.0])
+
+    store = side.ingest(str(export), csv_path=csv_path)
+    assert (tmp_path / 'data_hash_price.csv').read_text().splitlines() == [
+        'Date,hash_rate,market_price', '2022-01-08,1.5,100.0', '2022-01-09,2.5,101.0', '2022-01-10,,102.0']
+    # Série à jour par rapport au CSV : relue telle quelle
+    assert timeseries.load_series(side.SERIES_NAME, csv_path, 'Date').version == store.version
+
+    # Cache disque vidé, puis reprise : la série repart du CSV
+    monkeypatch.setattr(timeseries, 'SERIES_DIR', str(tmp_path / 'series-vide'))
+    write_export(export, [19000, 19001, 19002, 19003], [1.5, 2.5, 3.5, 4.5], [100.0, 101.0, 102.0, 103.0])
+    store = side.ingest(str(export), resume=True, csv_path=csv_path)
+
+    frame = timeseries.load_series(side.SERIES_NAME, csv_path, 'Date').to_frame('Date')
+    assert len(store) == len(frame) == 4
+    np.testing.assert_array_equal(frame['market_price'], [100.0, 101.0, 102.0, 103.0])
+    np.testing.assert_array_equal(frame['hash_rate'], [1.5, 2.5, 3.5, 4.5])
@@ -0,0 +1,20 @@
+# Un store ouvert reste lisible après le nettoyage de sa version par une écriture plus récente
+import numpy as np
+import pandas as pd
+
+import timeseries
+
+
+def test_open_store_survives_cleanup_of_its_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeseries, 'SERIES_DIR', str(tmp_path))
+    dates = pd.date_range('2020-01-01', periods=100)
+    store = timeseries.write_series('series', dates, {'a': np.arange(100.0), 'b': np.ones(100)})
+
+    # Toute version antérieure est supprimée par l'écriture suivante
+    monkeypatch.setattr(timeseries, 'STALE_VERSION_SECONDS', -1)
+    latest = timeseries.write_series('series', dates, {'a': np.zeros(100), 'b': np.zeros(100)})
+
+    assert not (tmp_path / 'series' / store.meta['directory']).exists()
+    np.testing.assert_array_equal(store['b'], np.ones(100))
+    np.testing.assert_array_equal(store.to_frame('date')['a'], np.arange(100.0))
+    assert timeseries.open_series('series').version == latest.version
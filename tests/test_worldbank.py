@@ -0,0 +1,92 @@
+# Indicateurs WDI de la Banque mondiale : découpage par années et par pays, agrégats séparés des pays, et
+# indicateur mémorisé par processus (relu si le fichier change)
+import os
+
+import numpy as np
+import pytest
+
+import loader
+import worldbank
+
+# Fichier WDI réduit (BOM UTF-8, quatre lignes d'en-tête, virgule finale)
+CSV = '\ufeff' + '''"Data Source","World Development Indicators",
+
+"Last Updated Date","2025-03-24",
+
+"Country Name","Country Code","Indicator Name","Indicator Code","2019","2020","2021","2022","2023",
+"Aruba","ABW","Croissance","NY.GDP","1.5","-20.1","","4.2","2.0",
+"Africa Eastern and Southern","AFE","Croissance","NY.GDP","2.1","-2.9","4.4","3.5","3.0",
+"France","FRA","Croissance","NY.GDP","2.0","-7.5","6.9","2.6","0.9",
+"World","WLD","Croissance","NY.GDP","2.6","-2.9","6.3","3.1","2.7",
+"Japon","JPN","Croissance","NY.GDP","-0.4","-4.2","2.7","1.0","1.9",
+'''
+
+
+@pytest.fixture
+def csv_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, 'SIDECAR_DIR', str(tmp_path / 'sidecars'))
+    monkeypatch.setattr(worldbank, '_indicators', {})
+    path = tmp_path / 'API_NY.GDP_DS2_fr_csv_v2_1.csv'
+    path.write_text(CSV, encoding='utf-8')
+    return str(path)
+
+
+def test_aggregates_are_separated_from_countries(csv_path):
+    indicator = worldbank.load_indicator(csv_path)
+
+    assert list(indicator.countries.codes) == ['ABW', 'FRA', 'JPN']
+    assert list(indicator.aggregates.codes) == ['AFE', 'WLD']
+    assert 'WLD' not in indicator.countries and 'WLD' in indicator.aggregates
+    assert indicator.table('WLD') is indicator.aggregates
+    assert indicator.value('WLD', 2021) == 6.3
+    assert indicator.value('FRA', 2021) == 6.9
+
+
+def test_year_and_country_slicing(csv_path):
+    indicator = worldbank.load_indicator(csv_path)
+    countries = indicator.countries
+
+    years, values = countries.series('FRA', 2020, 2022)
+    np.testing.assert_array_equal(years, [2020, 2021, 2022])
+    np.testing.assert_array_equal(values, [-7.5, 6.9, 2.6])
+    assert np.isnan(countries.value('ABW', 2021))
+    assert np.isnan(countries.value('ABW', 1990))
+    assert np.isnan(countries.column(2030)).all()
+    np.testing.assert_array_equal(countries.column(2023), [2.0, 0.9, 1.9])
+
+    years, matrix = countries.between(2022, 2030)
+    np.testing.assert_array_equal(years, [2022, 2023])
+    assert matrix.shape == (3, 2)
+
+
+def test_frame_keeps_file_order(csv_path):
+    indicator = worldbank.load_indicator(csv_path)
+
+    frame = indicator.frame(2021, 2022)
+    assert list(frame.columns) == ['Country Name', 'Country Code', '2021', '2022']
+    assert list(frame['Country Code']) == ['ABW', 'FRA', 'JPN']
+    assert frame['2022'].tolist() == [4.2, 2.6, 1.0]
+
+    frame = indicator.frame(2021, 2022, aggregates=True)
+    assert list(frame['Country Code']) == ['ABW', 'AFE', 'FRA', 'WLD', 'JPN']
+    assert list(frame['Country Name'])[3] == 'World'
+
+
+def test_indicator_is_memoized_until_file_changes(csv_path, monkeypatch):
+    reads = []
+    read_csv = worldbank.read_csv
+    monkeypatch.setattr(worldbank, 'read_csv', lambda path, **kwargs: reads.append(path) or read_csv(path, **kwargs))
+
+    first = worldbank.load_indicator(csv_path)
+    assert worldbank.load_indicator(csv_path) is first
+    assert len(reads) == 1
+
+    with open(csv_path, 'a', encoding='utf-8') as f:
+        f.write('"Chili","CHL","Croissance","NY.GDP","0.7","-6.1","11.3","2.1","0.2",\n')
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    reloaded = worldbank.load_indicator(csv_path)
+    assert reloaded is not first
+    assert len(reads) == 2
+    assert 'CHL' in reloaded.countries
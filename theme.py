@@ -0,0 +1,41 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Thème sombre du dashboard, enregistré une seule fois sous ce nom dans plotly.io.templates
+TEMPLATE = 'dashboard'
+
+# Types de traces utilisés par les pages : seuls leurs réglages par défaut sont repris de plotly_dark
+TRACE_TYPES = ('scatter', 'scattergeo', 'bar', 'choropleth', 'pie')
+# Parties de plotly_dark sans effet sur nos figures (sous-graphiques non utilisés ; les échelles de couleurs
+# par défaut ne servent qu'avec autocolorscale, plotly express écrivant ses échelles dans chaque figure)
+UNUSED_LAYOUT = ('polar', 'ternary', 'scene', 'mapbox', 'sliderdefaults', 'updatemenudefaults', 'colorscale')
+
+
+# Le template est inclus dans le JSON de chaque figure : il ne garde que ce qui s'applique au dashboard,
+# les réglages communs (fonds transparents, police, titre, marges, style des cartes) n'étant plus répétés
+# dans le layout de chaque figure
+def _build_template():
+    base = pio.templates['plotly_dark'].to_plotly_json()
+    template = go.layout.Template(
+        layout={key: value for key, value in base['layout'].items() if key not in UNUSED_LAYOUT},
+        data={key: value for key, value in base['data'].items() if key in TRACE_TYPES},
+    )
+    template.layout.update(
+        paper_bgcolor='rgba(0, 0, 0, 0)',  # Transparent
+        plot_bgcolor='rgba(0, 0, 0, 0)',  # Transparent
+        font=dict(color='#ffffff', family="Arial, sans-serif"),
+        title=dict(x=0.5, y=0.98, xanchor='center', yanchor='top', pad=dict(t=20)),
+        margin=dict(l=20, r=20, t=40, b=20),
+        geo=dict(
+            bgcolor='#1f2a44',
+            showcountries=True,
+            countrycolor="white",
+            showland=True,
+            landcolor="#2a3f5f"
+        ),
+    )
+    return template
+
+
+if TEMPLATE not in pio.templates:
+    pio.templates[TEMPLATE] = _build_template()
@@ -0,0 +1,126 @@
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache import CACHE_DIR, ROOT_DIR
+from loader import read_csv
+
+SERIES_DIR = os.path.join(CACHE_DIR, 'series')
+
+# Les anciennes versions d'une série sont conservées ce délai pour les lecteurs en cours d'ouverture
+STALE_VERSION_SECONDS = 60
+
+
+# Série temporelle stockée en tableaux NumPy alignés et projetés en mémoire (mmap) : dates en jours
+# depuis 1970-01-01 (int64) et une colonne float64 par variable. Tous les workers lisent les mêmes
+# pages du cache disque de l'OS au lieu de garder chacun leur copie des données.
+# Toutes les colonnes sont projetées dès l'ouverture : une projection reste lisible après la suppression de son
+# fichier, un store conservé longtemps (page reconstruite à intervalle) survit donc au nettoyage des anciennes versions.
+class SeriesStore:
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.meta = meta
+        self.dates = np.load(os.path.join(directory, 'dates.npy'), mmap_mode='r')
+        self._columns = {column: np.load(os.path.join(directory, f"{column}.npy"), mmap_mode='r')
+                         for column in meta['columns']}
+
+    @property
+    def version(self):
+        return self.meta['version']
+
+    @property
+    def columns(self):
+        return list(self.meta['columns'])
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, column):
+        return self._columns[column]
+
+    # --- Indices [début, fin[ des observations comprises entre deux dates (incluses) ---
+    def bounds(self, start=None, end=None):
+        lo = 0 if start is None else np.searchsorted(self.dates, _epoch_day(start), side='left')
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, _epoch_day(end), side='right')
+        return lo, hi
+
+    # --- Copie en DataFrame d'une plage de dates (seules les pages correspondantes sont lues) ---
+    def to_frame(self, date_column, columns=None, start=None, end=None):
+        lo, hi = self.bounds(start, end)
+        frame = pd.DataFrame({date_column: self.dates[lo:hi].astype('datetime64[D]').astype('datetime64[ns]')})
+        for column in columns or self.columns:
+            frame[column] = np.array(self[column][lo:hi])
+        return frame
+
+
+def _epoch_day(value):
+    return np.datetime64(pd.Timestamp(value), 'D').astype(np.int64)
+
+
+def _series_dir(name):
+    return os.path.join(SERIES_DIR, name)
+
+
+# --- Ouverture de la version courante d'une série (None si absente ou d'une autre version) ---
+def open_series(name, version=None):
+    try:
+        with open(os.path.join(_series_dir(name), 'current.json')) as f:
+            meta = json.load(f)
+        store = SeriesStore(os.path.join(_series_dir(name), meta['directory']), meta)
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+    if version is not None and store.version != version:
+        return None
+    return store
+
+
+# --- Écriture d'une nouvelle version : fichiers dans un répertoire neuf puis bascule atomique du pointeur ---
+def write_series(name, dates, columns, version=None, updated_ns=None):
+    base = _series_dir(name)
+    os.makedirs(base, exist_ok=True)
+    directory = tempfile.mkdtemp(prefix='v', dir=base)
+
+    days = np.asarray(pd.to_datetime(dates)).astype('datetime64[D]').astype(np.int64)
+    np.save(os.path.join(directory, 'dates.npy'), days)
+    for column, values in columns.items():
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) != len(days):
+            raise ValueError(f"Série {name} : la colonne {column} n'est pas alignée sur les dates")
+        np.save(os.path.join(directory, f"{column}.npy"), values)
+
+    updated_ns = time.time_ns() if updated_ns is None else updated_ns
+    meta = {'directory': os.path.basename(directory), 'columns': list(columns), 'length': len(days),
+            'version': version or str(updated_ns), 'updated_ns': updated_ns}
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=base)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(base, 'current.json'))
+
+    # Nettoyage des anciennes versions (les stores déjà ouverts gardent leurs projections)
+    for entry in os.listdir(base):
+        path = os.path.join(base, entry)
+        if entry != meta['directory'] and os.path.isdir(path):
+            if time.time() - os.path.getmtime(path) > STALE_VERSION_SECONDS:
+                shutil.rmtree(path, ignore_errors=True)
+        elif entry.endswith('.tmp') and time.time() - os.path.getmtime(path) > STALE_VERSION_SECONDS:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+    return SeriesStore(directory, meta)
+
+
+# Série construite à partir d'un CSV de data/ : reconstruite si le CSV a été modifié après la dernière
+# écriture de la série, qu'elle provienne de ce CSV ou d'un autre outil d'ingestion
+def load_series(name, csv_path, date_column):
+    store = open_series(name)
+    mtime_ns = os.stat(os.path.join(ROOT_DIR, csv_path)).st_mtime_ns
+    if store is not None and mtime_ns <= store.meta['updated_ns']:
+        return store
+    frame = read_csv(csv_path, parse_dates=[date_column])
+    columns = {column: frame[column] for column in frame.columns if column != date_column}
+    return write_series(name, frame[date_column], columns, updated_ns=mtime_ns)
@@ -0,0 +1,127 @@
+# Indicateurs de la Banque mondiale (téléchargements WDI "API_<indicateur>_DS2_<langue>_csv_v2_<n>.csv") :
+# chaque fichier est converti une fois par processus en une matrice pays × années (float64) indexée par code
+# ISO3, les agrégats régionaux ou par revenu (WLD, ARB, TEA...) étant rangés dans une table séparée.
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache import ROOT_DIR
+from loader import read_csv
+
+# Codes des agrégats publiés par la Banque mondiale (régions, groupes de revenu, zones de prêt, "Not classified")
+AGGREGATES = frozenset({
+    'AFE', 'AFW', 'ARB', 'CEB', 'CSS', 'EAP', 'EAR', 'EAS', 'ECA', 'ECS', 'EMU', 'EUU', 'FCS', 'HIC', 'HPC',
+    'IBD', 'IBT', 'IDA', 'IDB', 'IDX', 'INX', 'LAC', 'LCN', 'LDC', 'LIC', 'LMC', 'LMY', 'LTE', 'MEA', 'MIC',
+    'MNA', 'NAC', 'OED', 'OSS', 'PRE', 'PSS', 'PST', 'SAS', 'SSA', 'SSF', 'SST', 'TEA', 'TEC', 'TLA', 'TMN',
+    'TSA', 'TSS', 'UMC', 'WLD',
+})
+NAME_COLUMN = 'Country Name'
+CODE_COLUMN = 'Country Code'
+# Lignes d'en-tête ("Data Source", "Last Updated Date") avant le tableau
+HEADER_ROWS = 4
+
+
+# --- Table pays × années d'un indicateur ---
+class Table:
+    def __init__(self, codes, names, years, values, rows):
+        self.codes = codes
+        self.names = names
+        self.years = years
+        self.values = values
+        # Position de chaque ligne dans le fichier d'origine (ordre restitué par Indicator.frame)
+        self.rows = rows
+        self.index = {code: i for i, code in enumerate(codes)}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self.index
+
+    def _columns(self, start, end):
+        return slice(np.searchsorted(self.years, start), np.searchsorted(self.years, end, side='right'))
+
+    # Colonne d'une année, None si elle est absente du fichier
+    def _column(self, year):
+        column = np.searchsorted(self.years, year)
+        return column if column < len(self.years) and self.years[column] == year else None
+
+    # Valeur d'un pays pour une année (NaN si absente)
+    def value(self, code, year):
+        column = self._column(year)
+        return np.nan if column is None else self.values[self.index[code], column]
+
+    # Série d'un pays sur les années [start, end]
+    def series(self, code, start=None, end=None):
+        columns = self._columns(self.years[0] if start is None else start, self.years[-1] if end is None else end)
+        return self.years[columns], self.values[self.index[code], columns]
+
+    # Valeurs de tous les pays pour une année (NaN si l'année est absente du fichier)
+    def column(self, year):
+        column = self._column(year)
+        return np.full(len(self.codes), np.nan) if column is None else self.values[:, column]
+
+    # Tous les pays sur les années [start, end] : (années, matrice pays × années), sans copie
+    def between(self, start, end):
+        columns = self._columns(start, end)
+        return self.years[columns], self.values[:, columns]
+
+
+class Indicator:
+    def __init__(self, countries, aggregates):
+        self.countries = countries
+        self.aggregates = aggregates
+
+    def table(self, code):
+        return self.aggregates if code in self.aggregates else self.countries
+
+    def value(self, code, year):
+        return self.table(code).value(code, year)
+
+    # DataFrame au format des pages (nom, code ISO3 puis une colonne par année "AAAA") sur [start, end].
+    # Avec aggregates=True, les agrégats sont repris et toutes les lignes suivent l'ordre du fichier.
+    def frame(self, start, end, aggregates=False, name='Country Name', code='Country Code'):
+        tables = [self.countries, self.aggregates] if aggregates else [self.countries]
+        parts = []
+        for table in tables:
+            years, values = table.between(start, end)
+            parts.append((table.rows, table.names, table.codes, values))
+        rows, names, codes, values = (np.concatenate(arrays) for arrays in zip(*parts))
+        order = np.argsort(rows, kind='stable')
+        frame = pd.DataFrame(values[order], columns=[str(year) for year in years])
+        frame.insert(0, code, codes[order])
+        frame.insert(0, name, names[order])
+        return frame
+
+
+def _split(frame):
+    year_columns = [column for column in frame.columns if str(column).isdigit()]
+    years = np.array([int(column) for column in year_columns], dtype=np.int64)
+    order = np.argsort(years)
+    values = frame[year_columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)[:, order]
+    codes = frame[CODE_COLUMN].to_numpy(dtype=object)
+    names = frame[NAME_COLUMN].to_numpy(dtype=object)
+    is_aggregate = np.isin(codes, list(AGGREGATES))
+    tables = []
+    for mask in (~is_aggregate, is_aggregate):
+        rows = np.flatnonzero(mask)
+        tables.append(Table(codes[rows], names[rows], years[order], np.ascontiguousarray(values[rows]), rows))
+    return Indicator(*tables)
+
+
+_indicators = {}
+_lock = threading.Lock()
+
+
+# Indicateur d'un fichier WDI de data/, mémorisé par processus et relu si le fichier change
+# (le CSV lui-même est lu via le cache binaire de loader.read_csv)
+def load_indicator(path):
+    stat = os.stat(os.path.join(ROOT_DIR, path))
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        entry = _indicators.get(path)
+        if entry is None or entry[0] != signature:
+            entry = _indicators[path] = (signature, _split(read_csv(path, skiprows=HEADER_ROWS)))
+        return entry[1]
@@ -0,0 +1,83 @@
+# Zoom des graphiques sous-échantillonnés : identifiants, séries complètes servies par ce worker et callback.
+# Module importé par app.py et registry.py : les calculs (NumPy, pandas) sont dans downsample.py, importé par les
+# modules de pages et, au premier zoom, par le callback.
+import contextlib
+import threading
+
+from dash import MATCH, Input, Output, Patch, State, callback
+from dash.exceptions import PreventUpdate
+
+# Séries complètes des graphiques sous-échantillonnés, par clé "<module de page>:<nom>" : tableaux projetés en
+# mémoire (timeseries.SeriesStore) écrits sur disque à la construction de la page. Un worker qui a reçu le layout
+# du cache disque ou du préchargement les rouvre sans réexécuter le module de page, et tous les workers lisent
+# les mêmes pages du cache de l'OS.
+_series = {}
+# Séries préparées par une reconstruction de page en cours dans ce thread (voir staging)
+_local = threading.local()
+
+
+def graph_id(key):
+    return {'type': 'downsampled-graph', 'key': key}
+
+
+# Série servie pour un graphique, None si ce worker ne l'a pas encore ouverte
+def lookup(key):
+    return _series.get(key)
+
+
+# Enregistre la série d'un graphique, à part si une reconstruction de page est en cours dans ce thread
+def register(key, store):
+    staged = getattr(_local, 'staged', None)
+    (_series if staged is None else staged)[key] = store
+
+
+# Séries d'une page en cours de reconstruction : les graphiques construits dans ce thread sont rangés à part, et
+# les callbacks de zoom continuent de servir les séries de l'ancien layout jusqu'à install (voir PageRegistry.rebuild)
+@contextlib.contextmanager
+def staging():
+    _local.staged = staged = {}
+    try:
+        yield staged
+    finally:
+        _local.staged = None
+
+
+# Remplace les séries d'une page par celles préparées pour son nouveau layout ; les autres séries de la page
+# (layout relu depuis le cache, construit par un autre worker) seront rouvertes depuis le disque à la demande
+def install(page, staged):
+    for key in list(_series):
+        if key.split(':')[0] == page and key not in staged:
+            _series.pop(key, None)
+    _series.update(staged)
+
+
+# Zoom ou dézoom sur un graphique sous-échantillonné : seules les données de la courbe sont renvoyées
+# (Patch), recalculées à pleine résolution sur la plage visible
+@callback(
+    Output(graph_id(MATCH), 'figure'),
+    Input(graph_id(MATCH), 'relayoutData'),
+    State(graph_id(MATCH), 'id'),
+    prevent_initial_call=True
+)
+def update_downsampled_graph(relayout_data, component_id):
+    relayout_data = relayout_data or {}
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        start, end = relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']
+    elif 'xaxis.range' in relayout_data:
+        start, end = relayout_data['xaxis.range']
+    elif relayout_data.get('xaxis.autorange'):
+        start = end = None
+    else:
+        raise PreventUpdate
+
+    # Import au premier zoom seulement (déjà fait si ce worker a construit une page)
+    import downsample
+
+    points = downsample.window(component_id['key'], start, end)
+    if points is None:
+        raise PreventUpdate
+    xs, ys = points
+    patch = Patch()
+    patch['data'][0]['x'] = xs.astype('datetime64[s]').astype(str)
+    patch['data'][0]['y'] = ys
+    return patch